@@ -0,0 +1,266 @@
+"""Columnar cohort analytics over exported packs (NumPy).
+
+Packs are streamed in chunks into two arrays: ``sliders`` (uint8, one column
+per item in ``ITEM_COLUMNS``, the same order as ``AnswerStore.sliders``;
+``MISSING`` where unanswered) and ``values`` (uint32 bitsets over
+``VALUES_POOL``). ``CohortStats`` folds each chunk into fixed-size sufficient
+statistics, so memory depends on the chunk size, not on the number of packs:
+
+* per item: answered count, mean, std and the 0–10 histogram,
+* per insight dimension (``scoring.DIMENSIONS``, same defaults as
+  ``compute_scores``): mean, std and a half-point histogram,
+* pairwise-complete Pearson correlations between items and between dimensions,
+* how often each of ``VALUES_POOL`` was picked.
+
+Usage:
+    python analytics.py exports/ more.jsonl [--chunk-size 65536] [--out stats.json]
+"""
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from content import ATTACHMENT_ITEMS, BOUNDARY_STATEMENTS, VALUES_POOL
+from scoring import DIMENSIONS
+from share_codec import ATTACHMENT_STYLES
+
+MISSING = 0xFF
+N_BOUNDARIES = len(BOUNDARY_STATEMENTS)
+ITEM_COLUMNS = tuple(
+    [f"Gränser/{i}" for i in range(N_BOUNDARIES)]
+    + [f"{style}/{i}" for style in ATTACHMENT_STYLES for i in range(len(ATTACHMENT_ITEMS[style]))]
+)
+N_ITEMS = len(ITEM_COLUMNS)
+DIMENSION_NAMES = tuple(dim for dim, _ in DIMENSIONS)
+DIMENSION_BINS = np.linspace(0, 10, 21)
+
+_VALUE_INDEX = {v: i for i, v in enumerate(VALUES_POOL)}
+_UNANSWERED_BOUNDARY_AVG = 4.0
+
+
+def _style_slices() -> Dict[str, slice]:
+    out, off = {}, N_BOUNDARIES
+    for style in ATTACHMENT_STYLES:
+        out[style] = slice(off, off + len(ATTACHMENT_ITEMS[style]))
+        off += len(ATTACHMENT_ITEMS[style])
+    return out
+
+
+_STYLE_SLICES = _style_slices()
+
+
+@dataclass
+class Chunk:
+    sliders: np.ndarray  # (n, N_ITEMS) uint8, MISSING where unanswered
+    values: np.ndarray   # (n,) uint32 bitset over VALUES_POOL
+
+
+# --------- LOADING ---------
+def _scores_row(row: bytearray, start: int, scores: Any, n: int):
+    if isinstance(scores, list) and len(scores) == n:
+        try:
+            row[start:start + n] = bytes(min(max(int(round(s)), 0), 10) for s in scores)
+        except (TypeError, ValueError, OverflowError) as e:  # non-numbers, NaN, Infinity
+            raise ValueError(f"unusable scores: {e}") from None
+
+
+def pack_row(pack: Dict[str, Any]):
+    """One pack -> (slider bytes, values bitset); ValueError if its scores are unusable."""
+    answers = pack.get("answers", {})
+    row = bytearray(b"\xff" * N_ITEMS)
+    _scores_row(row, 0, answers.get("boundaries_scores"), N_BOUNDARIES)
+    att = answers.get("attachment_scores", {})
+    if isinstance(att, dict):
+        for style, sl in _STYLE_SLICES.items():
+            _scores_row(row, sl.start, att.get(style), sl.stop - sl.start)
+    bits = 0
+    for v in answers.get("top_values", ()) if isinstance(answers.get("top_values"), list) else ():
+        if v in _VALUE_INDEX:
+            bits |= 1 << _VALUE_INDEX[v]
+    return bytes(row), bits
+
+
+def iter_chunks(packs: Iterable[Dict[str, Any]], chunk_size: int = 65536,
+                rejected: Optional[Callable[[Dict[str, Any]], None]] = None) -> Iterator[Chunk]:
+    """Columnar chunks of at most ``chunk_size`` packs. Packs ``pack_row`` refuses
+    are left out and passed to ``rejected``."""
+    rows: List[bytes] = []
+    bits: List[int] = []
+    for pack in packs:
+        try:
+            r, b = pack_row(pack)
+        except ValueError:
+            if rejected is not None:
+                rejected(pack)
+            continue
+        rows.append(r)
+        bits.append(b)
+        if len(rows) == chunk_size:
+            yield _chunk(rows, bits)
+            rows, bits = [], []
+    if rows:
+        yield _chunk(rows, bits)
+
+
+def _chunk(rows: List[bytes], bits: List[int]) -> Chunk:
+    sliders = np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(len(rows), N_ITEMS)
+    return Chunk(sliders, np.fromiter(bits, dtype=np.uint32, count=len(bits)))
+
+
+def dimension_matrix(chunk: Chunk) -> np.ndarray:
+    """(n, 5) float64 insight scores, matching ``compute_scores`` per pack."""
+    s = chunk.sliders
+    out = np.empty((len(s), len(DIMENSIONS)))
+    for j, (_, style) in enumerate(DIMENSIONS):
+        block = s[:, :N_BOUNDARIES] if style is None else s[:, _STYLE_SLICES[style]]
+        valid = block != MISSING
+        answered = valid.sum(axis=1)
+        mean = np.where(valid, block, 0).sum(axis=1) / np.maximum(answered, 1)
+        out[:, j] = np.where(answered > 0, mean, _UNANSWERED_BOUNDARY_AVG if style is None else 0.0)
+    return out
+
+
+# --------- AGGREGATION ---------
+class _Moments:
+    """Fixed-size sums for means, stds and pairwise-complete correlations."""
+
+    def __init__(self, k: int):
+        self.n = np.zeros((k, k))      # rows where both i and j are present
+        self.s = np.zeros((k, k))      # sum of x_i over those rows
+        self.ss = np.zeros((k, k))     # sum of x_i^2 over those rows
+        self.xy = np.zeros((k, k))     # sum of x_i * x_j over those rows
+
+    def update(self, x: np.ndarray, present: np.ndarray):
+        m = present.astype(np.float64)
+        xm = np.where(present, x, 0.0)
+        self.n += m.T @ m
+        self.s += xm.T @ m
+        self.ss += (xm * xm).T @ m
+        self.xy += xm.T @ xm
+
+    def count(self) -> np.ndarray:
+        return np.diag(self.n)
+
+    def mean(self) -> np.ndarray:
+        return np.diag(self.s) / np.maximum(np.diag(self.n), 1)
+
+    def std(self) -> np.ndarray:
+        n = np.maximum(np.diag(self.n), 1)
+        return np.sqrt(np.maximum(np.diag(self.ss) / n - (np.diag(self.s) / n) ** 2, 0))
+
+    def corr(self) -> np.ndarray:
+        n = np.maximum(self.n, 1)
+        mi, mj = self.s / n, self.s.T / n
+        cov = self.xy / n - mi * mj
+        var_i = self.ss / n - mi ** 2
+        denom = np.sqrt(np.maximum(var_i * var_i.T, 0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out = np.where(denom > 0, cov / denom, np.nan)
+        out[self.n < 2] = np.nan
+        return out
+
+
+class CohortStats:
+    """Streaming aggregate of any number of chunks (memory independent of N)."""
+
+    def __init__(self):
+        self.packs = 0
+        self.items = _Moments(N_ITEMS)
+        self.dims = _Moments(len(DIMENSIONS))
+        self.item_hist = np.zeros((N_ITEMS, 11), dtype=np.int64)
+        self.dim_hist = np.zeros((len(DIMENSIONS), len(DIMENSION_BINS) - 1), dtype=np.int64)
+        self.value_counts = np.zeros(len(VALUES_POOL), dtype=np.int64)
+
+    def update(self, chunk: Chunk):
+        s = chunk.sliders
+        present = s != MISSING
+        self.packs += len(s)
+        self.items.update(s.astype(np.float64), present)
+        # Offsets per column turn the 2-D histogram into one bincount.
+        idx = np.where(present, s, 11) + np.arange(N_ITEMS) * 12
+        self.item_hist += np.bincount(idx.ravel(), minlength=N_ITEMS * 12).reshape(N_ITEMS, 12)[:, :11]
+
+        d = dimension_matrix(chunk)
+        self.dims.update(d, np.ones_like(d, dtype=bool))
+        bins = np.clip(np.searchsorted(DIMENSION_BINS, d, side="right") - 1, 0, len(DIMENSION_BINS) - 2)
+        width = len(DIMENSION_BINS) - 1
+        self.dim_hist += np.bincount((bins + np.arange(len(DIMENSIONS)) * width).ravel(),
+                                     minlength=len(DIMENSIONS) * width).reshape(len(DIMENSIONS), width)
+
+        picked = (chunk.values[:, None] >> np.arange(len(VALUES_POOL), dtype=np.uint32)) & 1
+        self.value_counts += picked.sum(axis=0, dtype=np.int64)
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        def _nan(a):
+            return [[None if np.isnan(v) else round(float(v), 4) for v in row] for row in a]
+        order = np.argsort(-self.value_counts, kind="stable")[:top]
+        return {
+            "packs": self.packs,
+            "dimensions": {
+                name: {"mean": round(float(m), 4), "std": round(float(sd), 4), "hist": h.tolist()}
+                for name, m, sd, h in zip(DIMENSION_NAMES, self.dims.mean(), self.dims.std(), self.dim_hist)
+            },
+            "dimension_bins": DIMENSION_BINS.tolist(),
+            "dimension_corr": _nan(self.dims.corr()),
+            "items": {
+                name: {"answered": int(c), "mean": round(float(m), 4), "std": round(float(sd), 4), "hist": h.tolist()}
+                for name, c, m, sd, h in zip(ITEM_COLUMNS, self.items.count(), self.items.mean(),
+                                             self.items.std(), self.item_hist)
+            },
+            "item_corr": _nan(self.items.corr()),
+            "top_values": [(VALUES_POOL[i], int(self.value_counts[i])) for i in order if self.value_counts[i]],
+        }
+
+
+def analyze(packs: Iterable[Dict[str, Any]], chunk_size: int = 65536,
+            rejected: Optional[Callable[[Dict[str, Any]], None]] = None) -> CohortStats:
+    stats = CohortStats()
+    for chunk in iter_chunks(packs, chunk_size, rejected):
+        stats.update(chunk)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from batch import iter_records
+
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("paths", nargs="+", help="export files, directories, or - for JSONL on stdin")
+    ap.add_argument("--chunk-size", type=int, default=65536)
+    ap.add_argument("--top", type=int, default=10, help="how many top values to list")
+    ap.add_argument("--out", help="write the JSON report here (default: stdout)")
+    args = ap.parse_args(argv)
+
+    skipped = 0
+
+    def packs():
+        nonlocal skipped
+        for _, text in iter_records(args.paths):
+            try:
+                pack = json.loads(text)
+            except (ValueError, RecursionError):  # RecursionError: absurdly nested JSON
+                pack = None
+            if isinstance(pack, dict) and isinstance(pack.get("answers", {}), dict):
+                yield pack
+            else:
+                skipped += 1
+
+    def rejected(_pack):
+        nonlocal skipped
+        skipped += 1
+
+    report = analyze(packs(), args.chunk_size, rejected).report(args.top)
+    report["skipped"] = skipped
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
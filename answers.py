@@ -0,0 +1,332 @@
+"""Compact per-session answer model.
+
+``st.session_state.answers`` used to be a loose dict of lists and dicts; with
+many sessions per process every list slot, dict entry and string-keyed card
+answer adds up. ``AnswerStore`` keeps the same information in fixed slots:
+
+* all 20 slider scores in one ``bytearray`` (boundaries first, then the
+  attachment styles in ``ATTACHMENT_STYLES`` order),
+* values/soothing picks as bitsets over the content tables,
+* reflection cards as a fixed-size list (choice answers are the shared
+  strings from ``REFLECTION_CARDS``),
+* free text capped at ``MAX_TEXT_CHARS``, the share decoder's per-field
+  limit. The whole pack can still be too long for a share link; see
+  ``share_codec.shareable_token``.
+
+Which answers exist is tracked in a presence bitmask, so ``to_dict()`` yields
+exactly the export format the dict model produced (pick order becomes table
+order). ``nbytes()`` estimates the per-session footprint, counting only
+objects the session owns.
+
+The store is written from widget callbacks, one change at a time. Setters
+that actually change something bump ``version`` (and the key's entry in
+``key_versions``, see ``changed_since``); export and autosave caches key off
+it. Slider sums are kept per block, so ``scores()`` is O(1).
+"""
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from content import (
+    ATTACHMENT_ITEMS, BOUNDARY_STATEMENTS, REFLECTION_CARDS, SOOTHING_INDEX, SOOTHING_OPTIONS, VALUE_INDEX, VALUES_POOL,
+)
+from schema import ANSWER_KEYS, ATTACHMENT_STYLES, MAX_TEXT_CHARS, TEXT_KEYS, TIMELINE_LEN
+from scoring import dimension_scores
+
+_BIT = {k: 1 << i for i, k in enumerate(ANSWER_KEYS)}
+_TEXT_INDEX = {k: i for i, k in enumerate(TEXT_KEYS)}
+# Pick key -> (content table, text -> bit index, slot holding its bitset).
+_PICKS = {"top_values": (VALUES_POOL, VALUE_INDEX, "values_bits"),
+          "soothing_kit": (SOOTHING_OPTIONS, SOOTHING_INDEX, "soothing_bits")}
+
+N_BOUNDARIES = len(BOUNDARY_STATEMENTS)
+
+
+def _style_offsets() -> Dict[str, int]:
+    out, off = {}, N_BOUNDARIES
+    for style in ATTACHMENT_STYLES:
+        out[style] = off
+        off += len(ATTACHMENT_ITEMS[style])
+    return out
+
+
+_STYLE_OFFSET = _style_offsets()
+N_SLIDERS = N_BOUNDARIES + sum(len(v) for v in ATTACHMENT_ITEMS.values())
+# Running sums: block 0 is the boundaries, block 1 + i is ATTACHMENT_STYLES[i].
+_BLOCK_LEN = (N_BOUNDARIES, *(len(ATTACHMENT_ITEMS[s]) for s in ATTACHMENT_STYLES))
+_SLIDER_BLOCK = bytes(b for b, n in enumerate(_BLOCK_LEN) for _ in range(n))
+_KEY_INDEX = {k: i for i, k in enumerate(ANSWER_KEYS)}
+# snapshot() slot -> answer keys whose changes rebuild it.
+_SNAPSHOT_SLOTS = {"sliders": ("boundaries_scores", "attachment_scores"), "style_mask": ("attachment_scores",),
+                   "values_bits": ("top_values",), "soothing_bits": ("soothing_kit",), "texts": TEXT_KEYS,
+                   "timeline": ("timeline_points",), "cards": ("reflection_cards",)}
+
+# compute_scores() treats missing boundary answers as all 4s.
+_UNANSWERED_BOUNDARY_AVG = 4
+
+
+def _cap(text: Any) -> str:
+    text = text if isinstance(text, str) else ""
+    return text[:MAX_TEXT_CHARS]
+
+
+def _score(v: Any) -> int:
+    return min(max(int(v), 0), 10)
+
+
+@dataclass(eq=False)
+class AnswerStore:
+    __slots__ = ("present", "sliders", "style_mask", "values_bits", "soothing_bits", "texts", "timeline", "cards",
+                 "sums", "version", "key_versions", "_snapshot")
+    present: int
+    sliders: bytearray
+    style_mask: int
+    values_bits: int
+    soothing_bits: int
+    texts: list
+    timeline: tuple
+    cards: list
+    sums: list          # slider sum per block (see _BLOCK_LEN)
+    version: int        # bumped by every setter that changes something
+    key_versions: list  # ANSWER_KEYS index -> version of its last change
+    _snapshot: tuple    # (version, snapshot()) of the last snapshot taken
+
+    @classmethod
+    def empty(cls) -> "AnswerStore":
+        return cls(0, bytearray(N_SLIDERS), 0, 0, 0, [""] * len(TEXT_KEYS),
+                   ("",) * TIMELINE_LEN, [None] * len(REFLECTION_CARDS),
+                   [0] * len(_BLOCK_LEN), 0, [0] * len(ANSWER_KEYS), (-1, None))
+
+    def has(self, key: str) -> bool:
+        return bool(self.present & _BIT[key])
+
+    def _changed(self, key: str):
+        self.version += 1
+        self.key_versions[_KEY_INDEX[key]] = self.version
+        self.present |= _BIT[key]
+
+    def changed_since(self, version: int) -> List[str]:
+        """Answer keys changed after ``version``."""
+        return [k for k, v in zip(ANSWER_KEYS, self.key_versions) if v > version]
+
+    # --------- free text ---------
+    def text(self, key: str) -> str:
+        return self.texts[_TEXT_INDEX[key]]
+
+    def set_text(self, key: str, value: str):
+        value, i = _cap(value), _TEXT_INDEX[key]
+        if self.texts[i] != value or not self.has(key):
+            self.texts[i] = value
+            self._changed(key)
+
+    def timeline_points(self) -> List[str]:
+        return list(self.timeline)
+
+    def set_timeline(self, points: List[str]):
+        timeline = tuple(_cap(p) for p in points[:TIMELINE_LEN])
+        if self.timeline != timeline or not self.has("timeline_points"):
+            self.timeline = timeline
+            self._changed("timeline_points")
+
+    # --------- sliders ---------
+    def _set_sliders(self, off: int, scores: Iterable[int], n: int) -> bool:
+        new = bytes(_score(s) for s in list(scores)[:n]).ljust(n, b"\0")
+        old = self.sliders[off:off + n]
+        if new == old:
+            return False
+        self.sliders[off:off + n] = new
+        self.sums[_SLIDER_BLOCK[off]] += sum(new) - sum(old)
+        return True
+
+    def _resum(self):
+        off = 0
+        for b, n in enumerate(_BLOCK_LEN):
+            self.sums[b] = sum(self.sliders[off:off + n])
+            off += n
+
+    def boundaries(self) -> Optional[List[int]]:
+        return list(self.sliders[:N_BOUNDARIES]) if self.has("boundaries_scores") else None
+
+    def set_boundaries(self, scores: List[int]):
+        if self._set_sliders(0, scores, N_BOUNDARIES) or not self.has("boundaries_scores"):
+            self._changed("boundaries_scores")
+
+    def set_boundary(self, i: int, score: int):
+        """One boundary slider (``on_change``); the others keep their values."""
+        if self._set_sliders(i, (score,), 1) or not self.has("boundaries_scores"):
+            self._changed("boundaries_scores")
+
+    def attachment(self, style: str) -> Optional[List[int]]:
+        bit = 1 << ATTACHMENT_STYLES.index(style)
+        if not self.style_mask & bit:
+            return None
+        off = _STYLE_OFFSET[style]
+        return list(self.sliders[off:off + len(ATTACHMENT_ITEMS[style])])
+
+    def _style_answered(self, style: str) -> bool:
+        bit = 1 << ATTACHMENT_STYLES.index(style)
+        if self.style_mask & bit:
+            return False
+        self.style_mask |= bit
+        return True
+
+    def set_attachment(self, style: str, scores: List[int]):
+        changed = self._set_sliders(_STYLE_OFFSET[style], scores, len(ATTACHMENT_ITEMS[style]))
+        if self._style_answered(style) or changed:
+            self._changed("attachment_scores")
+
+    def set_attachment_item(self, style: str, i: int, score: int):
+        """One attachment slider (``on_change``); the style's other items keep their values."""
+        changed = self._set_sliders(_STYLE_OFFSET[style] + i, (score,), 1)
+        if self._style_answered(style) or changed:
+            self._changed("attachment_scores")
+
+    # --------- picks ---------
+    def picked(self, key: str) -> List[str]:
+        table, _, slot = _PICKS[key]
+        bits = getattr(self, slot)
+        return [opt for i, opt in enumerate(table) if bits >> i & 1]
+
+    def set_picks(self, key: str, chosen: Iterable[str]):
+        _, index, slot = _PICKS[key]
+        bits = 0
+        for c in chosen:
+            if c in index:
+                bits |= 1 << index[c]
+        if getattr(self, slot) != bits or not self.has(key):
+            setattr(self, slot, bits)
+            self._changed(key)
+
+    # --------- reflection cards ---------
+    def card(self, idx: int) -> Optional[str]:
+        return self.cards[idx]
+
+    def set_card(self, idx: int, value: str):
+        card = REFLECTION_CARDS[idx]
+        if card["mode"] == "choice":
+            # Keep a reference to the shared content string, not a copy.
+            value = card["choices"][card["choices"].index(value)] if value in card["choices"] else None
+        else:
+            value = _cap(value)
+        if self.cards[idx] != value or not self.has("reflection_cards"):
+            self.cards[idx] = value
+            self._changed("reflection_cards")
+
+    # --------- consumers ---------
+    def scores(self) -> Dict[str, float]:
+        """Same numbers as ``scoring.compute_scores(self.to_dict())``, from the running sums."""
+        b_avg = self.sums[0] / N_BOUNDARIES if self.has("boundaries_scores") else _UNANSWERED_BOUNDARY_AVG
+        style_avgs = {style: self.sums[i + 1] / _BLOCK_LEN[i + 1]
+                      for i, style in enumerate(ATTACHMENT_STYLES) if self.style_mask >> i & 1}
+        return dimension_scores(b_avg, style_avgs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The answers in the export/share format (only answered keys)."""
+        out: Dict[str, Any] = {}
+        for key in ANSWER_KEYS:
+            if not self.has(key):
+                continue
+            if key in TEXT_KEYS:
+                out[key] = self.text(key)
+            elif key == "timeline_points":
+                out[key] = self.timeline_points()
+            elif key == "boundaries_scores":
+                out[key] = self.boundaries()
+            elif key == "attachment_scores":
+                out[key] = {s: self.attachment(s) for s in ATTACHMENT_STYLES if self.attachment(s) is not None}
+            elif key in _PICKS:
+                out[key] = self.picked(key)
+            elif key == "reflection_cards":
+                out[key] = {str(i): v for i, v in enumerate(self.cards) if v is not None}
+        return out
+
+    @classmethod
+    def from_dict(cls, answers: Dict[str, Any]) -> "AnswerStore":
+        store = cls.empty()
+        for key in TEXT_KEYS:
+            if key in answers:
+                store.set_text(key, answers[key])
+        if "timeline_points" in answers:
+            store.set_timeline(list(answers["timeline_points"]))
+        if "boundaries_scores" in answers:
+            store.set_boundaries(answers["boundaries_scores"])
+        for style, scores in answers.get("attachment_scores", {}).items():
+            if style in _STYLE_OFFSET:
+                store.set_attachment(style, scores)
+        for key in _PICKS:
+            if key in answers:
+                store.set_picks(key, answers[key])
+        for idx, value in answers.get("reflection_cards", {}).items():
+            if str(idx).isdigit() and int(idx) < len(REFLECTION_CARDS):
+                store.set_card(int(idx), value)
+        return store
+
+    # --------- autosave ---------
+    def snapshot(self) -> Dict[str, Any]:
+        """Slot -> immutable, JSON-able value, compared field by field to find changes.
+
+        Shared until the next change (do not mutate); slots whose keys did not
+        change since the last snapshot are reused, not rebuilt."""
+        seen, prev = self._snapshot
+        if seen == self.version:
+            return prev
+        changed = set(self.changed_since(seen)) if prev is not None else None
+        snap = {"present": self.present}
+        for slot, keys in _SNAPSHOT_SLOTS.items():
+            if changed is None or changed.intersection(keys):
+                value = getattr(self, slot)
+                snap[slot] = tuple(value) if isinstance(value, (bytearray, list)) else value
+            else:
+                snap[slot] = prev[slot]
+        self._snapshot = (self.version, snap)
+        return snap
+
+    @classmethod
+    def from_snapshot(cls, fields: Dict[str, Any]) -> "AnswerStore":
+        """Inverse of ``snapshot()`` (values may be lists after a JSON round trip); bounds re-checked."""
+        store = cls.empty()
+        store.sliders[:] = bytes(_score(s) for s in list(fields.get("sliders", ()))[:N_SLIDERS]).ljust(N_SLIDERS, b"\0")
+        for i, t in enumerate(list(fields.get("texts", ()))[:len(TEXT_KEYS)]):
+            store.texts[i] = _cap(t)
+        timeline = [_cap(p) for p in list(fields.get("timeline", ()))[:TIMELINE_LEN]]
+        store.timeline = tuple(timeline + [""] * (TIMELINE_LEN - len(timeline)))
+        for i, v in enumerate(list(fields.get("cards", ()))[:len(REFLECTION_CARDS)]):
+            if v is not None:
+                store.set_card(i, v)
+        store.present = int(fields.get("present", 0)) & ((1 << len(ANSWER_KEYS)) - 1)
+        store.style_mask = int(fields.get("style_mask", 0)) & ((1 << len(ATTACHMENT_STYLES)) - 1)
+        store.values_bits = int(fields.get("values_bits", 0)) & ((1 << len(VALUES_POOL)) - 1)
+        store.soothing_bits = int(fields.get("soothing_bits", 0)) & ((1 << len(SOOTHING_OPTIONS)) - 1)
+        store._resum()
+        return store
+
+    def nbytes(self) -> int:
+        """Estimated bytes this session owns (shared content strings excluded)."""
+        return deep_sizeof(self)
+
+
+# --------- MEMORY ACCOUNTING ---------
+_SHARED = {id(s) for s in (*VALUES_POOL, *SOOTHING_OPTIONS, *ANSWER_KEYS, *ATTACHMENT_STYLES, "")}
+_SHARED.update(id(c) for card in REFLECTION_CARDS for c in card.get("choices", ()))
+
+
+def deep_sizeof(obj: Any) -> int:
+    """``sys.getsizeof`` over the object graph, counting each object once and
+    skipping what all sessions share (small ints, None/bools, content strings)."""
+    seen = set(_SHARED)
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or o is None or isinstance(o, bool) or (type(o) is int and -5 <= o <= 256):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif hasattr(type(o), "__slots__"):
+            stack.extend(getattr(o, s) for s in type(o).__slots__ if hasattr(o, s))
+    return total
@@ -0,0 +1,258 @@
+"""Opt-in encrypted autosave behind a write-behind queue (SQLite, WAL mode).
+
+Each rerun the app hands ``track()`` a snapshot of the session's fields; only
+fields that differ from the previous snapshot are queued. A background thread
+coalesces the queue (the latest value per field wins) and writes once per
+``flush_interval_s``, so a rerun costs a dict diff and a ``put`` and never
+waits for the disk or the cipher.
+
+A session is keyed by a random resume code that only the user sees. The row
+ID and the AES-GCM key are both derived from it (HMAC with an optional server
+secret), so the database alone can neither be read nor linked to a code. Each
+field is its own row, encrypted with its ID and name as associated data.
+``load(code)`` restores a session; ``purge(code)`` drops queued writes and
+deletes the rows before it returns.
+
+Needs the optional ``cryptography`` package; without it ``AVAILABLE`` is
+False and the app leaves the feature off.
+"""
+import base64
+import functools
+import hashlib
+import hmac
+import json
+import os
+import queue
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import metrics
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # optional dependency
+    AESGCM = None
+
+AVAILABLE = AESGCM is not None
+
+CODE_BYTES = 10  # 80 bits -> 16 base32 chars, shown as XXXX-XXXX-XXXX-XXXX
+_CODE_RE = re.compile(r"^[A-Z2-7]{16}$")
+
+QUEUED_METRIC = "mirrorgarden_autosave_queued_total"
+WRITES_METRIC = "mirrorgarden_autosave_writes_total"
+OPS_METRIC = "mirrorgarden_autosave_ops_total"
+metrics.describe(QUEUED_METRIC, "Changed fields queued by reruns (before coalescing).")
+metrics.describe(WRITES_METRIC, "Encrypted field rows written by the autosave thread.")
+metrics.describe(OPS_METRIC, "Autosave flushes, loads and purges by result.")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fields (
+    sid     TEXT NOT NULL,
+    name    TEXT NOT NULL,
+    nonce   BLOB NOT NULL,
+    data    BLOB NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (sid, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fields_updated ON fields (updated);
+"""
+_UPSERT = ("INSERT INTO fields (sid, name, nonce, data, updated) VALUES (?, ?, ?, ?, ?) "
+           "ON CONFLICT (sid, name) DO UPDATE SET nonce = excluded.nonce, data = excluded.data, "
+           "updated = excluded.updated")
+
+_UNSET = object()
+_PURGED_KEEP = 1024
+
+
+def new_code() -> str:
+    raw = base64.b32encode(secrets.token_bytes(CODE_BYTES)).decode("ascii")
+    return "-".join(raw[i:i + 4] for i in range(0, len(raw), 4))
+
+
+def normalize_code(text: Optional[str]) -> Optional[str]:
+    """Canonical ``XXXX-XXXX-XXXX-XXXX`` form of a typed code, or None if it cannot be one."""
+    raw = re.sub(r"[\s-]", "", text or "").upper()
+    if not _CODE_RE.match(raw):
+        return None
+    return "-".join(raw[i:i + 4] for i in range(0, 16, 4))
+
+
+@functools.lru_cache(maxsize=4096)
+def _derive(secret: bytes, code: str) -> Tuple[str, bytes]:
+    """(row ID, AES key) for a resume code."""
+    def mac(label: bytes) -> bytes:
+        return hmac.new(secret, label + b"\0" + code.encode("ascii"), hashlib.sha256).digest()
+    return mac(b"id").hex()[:32], mac(b"key")
+
+
+class Autosave:
+    """Write-behind, encrypted field store; one writer thread per instance."""
+
+    def __init__(self, path: str, secret: bytes = b"", flush_interval_s: float = 0.5,
+                 ttl_s: float = 7 * 86400, clock: Callable[[], float] = time.time):
+        if not AVAILABLE:
+            raise RuntimeError("autosave needs the 'cryptography' package")
+        self.secret = secret
+        self.flush_interval_s = flush_interval_s
+        self.ttl_s = ttl_s
+        self.clock = clock
+        self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._queue: "queue.SimpleQueue[Optional[Tuple[str, Dict[str, Any]]]]" = queue.SimpleQueue()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # Recently purged codes: the writer may hold one already-dequeued change for them.
+        self._purged: Dict[str, None] = {}
+        self._lock = threading.Lock()  # guards _pending and _purged
+        self._io = threading.Lock()    # one flush, load or purge on the connection at a time
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="autosave-writer", daemon=True)
+        self._thread.start()
+
+    # --------- rerun path ---------
+    def track(self, code: str, fields: Dict[str, Any], last: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue the fields that changed since ``last``; returns ``fields`` as the next ``last``."""
+        changed = {k: v for k, v in fields.items() if last.get(k, _UNSET) != v}
+        if changed:
+            self._queue.put((code, changed))
+        return fields
+
+    # --------- writer ---------
+    def _run(self):
+        while not self._closed.is_set():
+            try:
+                item = self._queue.get(timeout=self.flush_interval_s)
+            except queue.Empty:
+                continue
+            self._merge(item)
+            # Collect whatever else arrives within one interval, then write once.
+            deadline = time.monotonic() + self.flush_interval_s
+            while not self._closed.is_set():
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                try:
+                    self._merge(self._queue.get(timeout=left))
+                except queue.Empty:
+                    break
+            self.flush()
+
+    def _merge(self, item: Optional[Tuple[str, Dict[str, Any]]]):
+        if item is None:  # close() waking the writer
+            return
+        code, changed = item
+        with self._lock:
+            if code in self._purged:
+                return
+            self._pending.setdefault(code, {}).update(changed)
+        metrics.inc(QUEUED_METRIC, by=len(changed))
+
+    def _drain(self):
+        while True:
+            try:
+                self._merge(self._queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def flush(self):
+        """Write everything queued so far (the writer thread calls this; so can tests)."""
+        with self._io:
+            self._drain()
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            try:
+                self._write(batch)
+            except sqlite3.Error:
+                # Keep the batch; newer changes queued meanwhile win.
+                with self._lock:
+                    for code, fields in batch.items():
+                        self._pending[code] = {**fields, **self._pending.get(code, {})}
+                metrics.inc(OPS_METRIC, {"op": "flush", "result": "error"})
+                return
+        metrics.inc(OPS_METRIC, {"op": "flush", "result": "ok"})
+
+    def _write(self, batch: Dict[str, Dict[str, Any]]):
+        now = self.clock()
+        rows, sids = [], []
+        for code, fields in batch.items():
+            sid, key = _derive(self.secret, code)
+            aes = AESGCM(key)
+            sids.append((now, sid))
+            for name, value in fields.items():
+                nonce = os.urandom(12)
+                plain = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                rows.append((sid, name, nonce, aes.encrypt(nonce, plain, f"{sid}\0{name}".encode("utf-8")), now))
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(_UPSERT, rows)
+            # Unchanged fields of a live session must not expire before the changed ones.
+            db.executemany("UPDATE fields SET updated = ? WHERE sid = ?", sids)
+            db.execute("DELETE FROM fields WHERE updated < ?", (now - self.ttl_s,))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        metrics.inc(WRITES_METRIC, by=len(rows))
+
+    # --------- restore / purge ---------
+    def load(self, code: str) -> Optional[Dict[str, Any]]:
+        """Saved fields for ``code``; None if unknown, expired, unreadable or tampered with."""
+        sid, key = _derive(self.secret, code)
+        self.flush()
+        try:
+            with self._io:
+                rows = self._db.execute("SELECT name, nonce, data FROM fields WHERE sid = ? AND updated >= ?",
+                                        (sid, self.clock() - self.ttl_s)).fetchall()
+        except sqlite3.Error:
+            metrics.inc(OPS_METRIC, {"op": "load", "result": "error"})
+            return None
+        aes = AESGCM(key)
+        try:
+            out = {name: json.loads(aes.decrypt(nonce, data, f"{sid}\0{name}".encode("utf-8")))
+                   for name, nonce, data in rows}
+        except (InvalidTag, ValueError):
+            metrics.inc(OPS_METRIC, {"op": "load", "result": "invalid"})
+            return None
+        metrics.inc(OPS_METRIC, {"op": "load", "result": "hit" if out else "miss"})
+        return out or None
+
+    def purge(self, code: str) -> bool:
+        """Synchronously forget ``code``: queued changes are dropped and its rows deleted.
+        Holding ``_io`` also waits out a flush already in flight, so nothing is re-written."""
+        sid, _ = _derive(self.secret, code)
+        with self._io:
+            self._drain()
+            with self._lock:
+                self._pending.pop(code, None)
+                self._purged[code] = None
+                if len(self._purged) > _PURGED_KEEP:
+                    del self._purged[next(iter(self._purged))]
+            try:
+                self._db.execute("DELETE FROM fields WHERE sid = ?", (sid,))
+            except sqlite3.Error:
+                metrics.inc(OPS_METRIC, {"op": "purge", "result": "error"})
+                return False
+        metrics.inc(OPS_METRIC, {"op": "purge", "result": "ok"})
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._io:
+            sessions, rows = self._db.execute("SELECT COUNT(DISTINCT sid), COUNT(*) FROM fields").fetchone()
+        return {"sessions": sessions, "rows": rows}
+
+    def close(self):
+        self._closed.set()
+        self._queue.put(None)
+        self._thread.join()
+        self.flush()
+        with self._io:
+            self._db.close()
@@ -0,0 +1,136 @@
+"""Re-render reports for exported packs without booting the UI.
+
+Reads ``mirror-garden.json`` exports from files, directories (``*.json`` and
+``*.jsonl``) or stdin (``-``, JSONL) and writes one JSON line per pack, in
+input order: ``{"source", "scores", "markdown"}`` or ``{"source", "error"}``.
+Packs are parsed, validated, rescored and rendered in a process pool; at most
+``--window`` chunks are in flight, so memory stays flat however many exports
+are streamed through.
+
+Usage:
+    python batch.py exports/ more.jsonl --out reports.jsonl [--workers 8]
+    python batch.py exports/ --md-dir reports/      # one .md per pack
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import core
+from share_codec import ShareTokenError, validate_pack
+
+Record = Tuple[str, str]  # (source, raw JSON text)
+
+
+# --------- INPUT ---------
+def _iter_jsonl(lines: Iterable[str], source: str) -> Iterator[Record]:
+    for lineno, line in enumerate(lines, 1):
+        if line.strip():
+            yield f"{source}:{lineno}", line
+
+
+def iter_records(paths: List[str]) -> Iterator[Record]:
+    """Lazily yield (source, text) for every pack under ``paths``, in sorted order."""
+    for path in paths:
+        if path == "-":
+            yield from _iter_jsonl(sys.stdin, "<stdin>")
+        elif os.path.isdir(path):
+            names = sorted(n for n in os.listdir(path) if n.endswith((".json", ".jsonl")))
+            yield from iter_records([os.path.join(path, n) for n in names])
+        elif path.endswith(".jsonl"):
+            with open(path, encoding="utf-8") as f:
+                yield from _iter_jsonl(f, path)
+        else:
+            with open(path, encoding="utf-8") as f:
+                yield path, f.read()
+
+
+# --------- WORK ---------
+def process(record: Record) -> Dict[str, Any]:
+    source, text = record
+    try:
+        pack = json.loads(text)
+        validate_pack(pack)
+    except ValueError as e:
+        return {"source": source, "error": e.reason if isinstance(e, ShareTokenError) else "json"}
+    except RecursionError:  # absurdly nested JSON: reject the line, not the batch
+        return {"source": source, "error": "nesting"}
+    pack = core.rescore(pack)
+    return {"source": source, "scores": pack["scores"], "markdown": core.make_markdown_report(pack)}
+
+
+def _process_chunk(chunk: List[Record]) -> List[Dict[str, Any]]:
+    return [process(r) for r in chunk]
+
+
+def _chunks(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    it = iter(records)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def run(records: Iterable[Record], workers: int = 0, chunk_size: int = 64, window: int = 0) -> Iterator[Dict[str, Any]]:
+    """Results in input order. ``workers <= 1`` runs in-process; otherwise at most
+    ``window`` chunks (default 4 per worker) are queued or running at once."""
+    if workers <= 1:
+        for chunk in _chunks(records, chunk_size):
+            yield from _process_chunk(chunk)
+        return
+    window = window or 4 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(records, chunk_size):
+            pending.append(pool.submit(_process_chunk, chunk))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# --------- OUTPUT ---------
+def _md_name(source: str) -> str:
+    """``dir/x.json`` -> ``x.md``; ``dir/all.jsonl:12`` -> ``all-12.md``."""
+    stem = re.sub(r"\.jsonl?(?=:|$)", "", os.path.basename(source)).replace(":", "-")
+    return re.sub(r"[^\w.-]+", "_", stem) + ".md"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("paths", nargs="+", help="export files, directories, or - for JSONL on stdin")
+    ap.add_argument("--out", help="results JSONL (default: stdout)")
+    ap.add_argument("--md-dir", help="write each report to <dir>/<source>.md and omit it from the JSONL")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--chunk-size", type=int, default=64)
+    ap.add_argument("--window", type=int, default=0, help="max chunks in flight (default: 4 per worker)")
+    args = ap.parse_args(argv)
+
+    if args.md_dir:
+        os.makedirs(args.md_dir, exist_ok=True)
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    done = errors = 0
+    t0 = time.perf_counter()
+    try:
+        for res in run(iter_records(args.paths), args.workers, args.chunk_size, args.window):
+            done += 1
+            if "error" in res:
+                errors += 1
+            elif args.md_dir:
+                with open(os.path.join(args.md_dir, _md_name(res["source"])), "w", encoding="utf-8") as f:
+                    f.write(res.pop("markdown"))
+            out.write(json.dumps(res, ensure_ascii=False, allow_nan=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - t0
+    print(f"{done} packs, {errors} rejected, {elapsed:.1f}s ({done / max(elapsed, 1e-9):,.0f}/s)", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
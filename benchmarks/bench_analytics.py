@@ -0,0 +1,145 @@
+"""Cohort analytics: vectorized chunks vs a naive per-pack Python loop.
+
+Both compute the same numbers (dimension and item means, pairwise item and
+dimension correlations, item histograms, value frequencies) over the same
+parsed packs. A second pass streams up to a million packs through
+``analytics.analyze`` to show that peak memory follows the chunk size, not N.
+
+Usage: python benchmarks/bench_analytics.py [--packs 20000] [--stream 100000 1000000]
+"""
+import argparse
+import itertools
+import math
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics  # noqa: E402
+from analytics import DIMENSION_NAMES, ITEM_COLUMNS, N_ITEMS  # noqa: E402
+from benchmarks.synthetic import synthetic_packs  # noqa: E402
+from scoring import compute_scores  # noqa: E402
+from share_codec import ATTACHMENT_STYLES  # noqa: E402
+
+
+def _items(answers: Dict[str, Any]) -> List[Any]:
+    row = list(answers.get("boundaries_scores") or [None] * 8)
+    att = answers.get("attachment_scores", {})
+    for style in ATTACHMENT_STYLES:
+        row.extend(att.get(style) or [None] * 3)
+    return row
+
+
+def naive(packs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The straightforward loop: one pack, one item pair at a time."""
+    k = N_ITEMS
+    n = [[0] * k for _ in range(k)]
+    s = [[0.0] * k for _ in range(k)]
+    ss = [[0.0] * k for _ in range(k)]
+    xy = [[0.0] * k for _ in range(k)]
+    hist = [[0] * 11 for _ in range(k)]
+    dims = []
+    values = Counter()
+    for p in packs:
+        answers = p["answers"]
+        scores = compute_scores(answers)
+        dims.append([scores[d] for d in DIMENSION_NAMES])
+        values.update(answers.get("top_values", []))
+        row = _items(answers)
+        for i, x in enumerate(row):
+            if x is None:
+                continue
+            hist[i][x] += 1
+            for j, y in enumerate(row):
+                if y is None:
+                    continue
+                n[i][j] += 1
+                s[i][j] += x
+                ss[i][j] += x * x
+                xy[i][j] += x * y
+
+    def corr(i, j):
+        c = n[i][j]
+        if c < 2:
+            return math.nan
+        mi, mj = s[i][j] / c, s[j][i] / c
+        vi, vj = ss[i][j] / c - mi * mi, ss[j][i] / c - mj * mj
+        return (xy[i][j] / c - mi * mj) / math.sqrt(vi * vj) if vi * vj > 0 else math.nan
+
+    d = len(DIMENSION_NAMES)
+    means = [sum(r[j] for r in dims) / len(dims) for j in range(d)]
+    dim_corr = [[0.0] * d for _ in range(d)]
+    for i in range(d):
+        for j in range(d):
+            cov = sum((r[i] - means[i]) * (r[j] - means[j]) for r in dims)
+            vi = sum((r[i] - means[i]) ** 2 for r in dims)
+            vj = sum((r[j] - means[j]) ** 2 for r in dims)
+            dim_corr[i][j] = cov / math.sqrt(vi * vj) if vi * vj > 0 else math.nan
+    return {
+        "dim_mean": means,
+        "dim_corr": dim_corr,
+        "item_mean": [s[i][i] / max(n[i][i], 1) for i in range(k)],
+        "item_corr": [[corr(i, j) for j in range(k)] for i in range(k)],
+        "item_hist": hist,
+        "values": values,
+    }
+
+
+def _check(ref: Dict[str, Any], stats: analytics.CohortStats):
+    assert np.allclose(ref["dim_mean"], stats.dims.mean())
+    assert np.allclose(ref["dim_corr"], stats.dims.corr(), equal_nan=True)
+    assert np.allclose(ref["item_mean"], stats.items.mean())
+    assert np.allclose(ref["item_corr"], stats.items.corr(), equal_nan=True)
+    assert np.array_equal(ref["item_hist"], stats.item_hist)
+    assert {v: c for v, c in ref["values"].items()} == {v: c for v, c in stats.report(99)["top_values"]}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--packs", type=int, default=20000)
+    ap.add_argument("--stream", type=int, nargs="*", default=[100_000, 1_000_000])
+    ap.add_argument("--chunk-size", type=int, default=65536)
+    args = ap.parse_args()
+
+    packs = list(synthetic_packs(args.packs))
+    t0 = time.perf_counter()
+    ref = naive(packs)
+    t_naive = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    chunks = list(analytics.iter_chunks(packs, args.chunk_size))
+    t_load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    stats = analytics.CohortStats()
+    for chunk in chunks:
+        stats.update(chunk)
+    t_agg = time.perf_counter() - t0
+    _check(ref, stats)
+
+    t_vec = t_load + t_agg
+    print(f"packs: {len(packs)}, items: {len(ITEM_COLUMNS)}, results identical")
+    print(f"{'naive loop':>14}{t_naive:>9.3f}s{len(packs) / t_naive:>12,.0f} packs/s")
+    print(f"{'vectorized':>14}{t_vec:>9.3f}s{len(packs) / t_vec:>12,.0f} packs/s   ({t_naive / t_vec:.1f}x)")
+    print(f"{'  load':>14}{t_load:>9.3f}s   (dict -> columns, per pack)")
+    print(f"{'  aggregate':>14}{t_agg:>9.3f}s   ({t_naive / t_agg:.0f}x the naive loop)")
+
+    # Streaming: cycle a small pool so generating input stays cheap.
+    pool = packs[:2000]
+    print(f"\nstreaming, chunk size {args.chunk_size}:")
+    for n in args.stream:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        analytics.analyze(itertools.islice(itertools.cycle(pool), n), args.chunk_size)
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{n:>12,} packs{elapsed:>9.1f}s (traced){peak / 2**20:>9.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
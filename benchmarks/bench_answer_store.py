@@ -0,0 +1,72 @@
+"""Memory held by N sessions' answers: legacy dicts vs the compact AnswerStore.
+
+Each simulated session holds the answers of one synthetic journey, either as
+the loose dict the app used to keep in ``st.session_state.answers`` or as an
+``AnswerStore``. Reports the per-session estimate (``deep_sizeof``), the bytes
+actually allocated for all sessions (tracemalloc) and sessions per GiB.
+
+Usage: python benchmarks/bench_answer_store.py [--sessions 1000 10000]
+"""
+import argparse
+import copy
+import gc
+import os
+import random
+import statistics
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answers import AnswerStore, deep_sizeof  # noqa: E402
+from benchmarks.synthetic import synthetic_pack  # noqa: E402
+
+GIB = 1 << 30
+
+
+def _answers(n: int, seed: int):
+    rng = random.Random(seed)
+    for _ in range(n):
+        # Widget values arrive as fresh objects per session, never shared.
+        yield copy.deepcopy(synthetic_pack(rng)["answers"])
+
+
+def _allocated(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return after - before
+
+
+def run(n: int, seed: int = 5):
+    legacy = list(_answers(n, seed))
+    stores = [AnswerStore.from_dict(a) for a in legacy]
+    est_legacy = statistics.mean(deep_sizeof(a) for a in legacy)
+    est_store = statistics.mean(s.nbytes() for s in stores)
+    del legacy, stores
+
+    alloc_legacy = _allocated(lambda: list(_answers(n, seed)))
+    alloc_store = _allocated(lambda: [AnswerStore.from_dict(a) for a in _answers(n, seed)])
+    return est_legacy, est_store, alloc_legacy / n, alloc_store / n
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, nargs="+", default=[1000, 10000])
+    args = ap.parse_args()
+
+    print(f"{'sessions':>9}{'model':>8}{'est B/sess':>12}{'alloc B/sess':>14}{'sess/GiB':>12}")
+    for n in args.sessions:
+        est_l, est_s, al_l, al_s = run(n)
+        for model, est, alloc in (("dict", est_l, al_l), ("store", est_s, al_s)):
+            print(f"{n:>9}{model:>8}{est:>12.0f}{alloc:>14.0f}{GIB / alloc:>12,.0f}")
+        print(f"{'':>9}{'':>8}{est_s / est_l - 1:>+12.0%}{al_s / al_l - 1:>+14.0%}")
+
+
+if __name__ == "__main__":
+    main()
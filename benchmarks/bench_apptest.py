@@ -0,0 +1,217 @@
+"""Rerun cost of a full MirrorGarden session, driven through ``AppTest``.
+
+Walks all SECTIONS with realistic answers: every slider is moved, every
+reflection card drawn and answered, the summary exports are rendered and the
+generated report link is opened. For each step it records script execution
+time, allocated memory (tracemalloc, measured in separate passes so it does
+not skew timings) and the serialized size of the produced elements.
+
+Usage:
+    python benchmarks/bench_apptest.py [--repeat 5] [--out results.json]
+    python benchmarks/bench_apptest.py --save-baseline baseline.json
+    python benchmarks/bench_apptest.py --baseline baseline.json   # exit 1 on regressions
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit  # noqa: E402
+import streamlit.logger  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.testing.v1.element_tree import Block  # noqa: E402
+
+from benchmarks.synthetic import synthetic_pack  # noqa: E402
+from benchmarks.ws_session import APP  # noqa: E402
+from content import ATTACHMENT_ITEMS, REFLECTION_CARDS  # noqa: E402
+
+# Relative slack per metric before a step counts as regressed, plus an
+# absolute floor so sub-millisecond noise never trips the check. Single-step
+# timings are noisy; the session total gets the tighter TOTAL_TOLERANCE.
+TOLERANCE = {"time_ms": 0.5, "alloc_kb": 0.15, "elements_bytes": 0.05}
+TOTAL_TOLERANCE = {"time_ms": 0.15, "alloc_kb": 0.1, "elements_bytes": 0.02}
+FLOOR = {"time_ms": 2.0, "alloc_kb": 16.0, "elements_bytes": 64}
+
+
+def _elements_bytes(at: AppTest) -> int:
+    return sum(node.proto.ByteSize() for node in at.main
+               if not isinstance(node, Block) and getattr(node, "proto", None) is not None)
+
+
+def _click(at: AppTest, label: str, contains: bool = False):
+    next(b for b in at.button if b.label == label or (contains and label in b.label)).click()
+
+
+class Recorder:
+    """Runs each step, timing it (and optionally tracing allocations)."""
+
+    def __init__(self, memory: bool):
+        self.memory = memory
+        self.steps: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+
+    def step(self, name: str, at: AppTest, act: Callable[[], None] = lambda: None) -> AppTest:
+        act()
+        if self.memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - t0
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].value}")
+        rec = {"time_ms": elapsed * 1000, "elements_bytes": _elements_bytes(at)}
+        if self.memory:
+            rec["alloc_kb"] = (tracemalloc.get_traced_memory()[1] - before) / 1024
+        self.steps[name] = rec
+        return at
+
+
+def journey(rec: Recorder, seed: int = 11):
+    pack = synthetic_pack(random.Random(seed))
+    ans = pack["answers"]
+    # Every pass starts cold, so "report/open" is always a cache miss.
+    streamlit.cache_resource.clear()
+    at = AppTest.from_file(APP, default_timeout=60)
+
+    rec.step("intro/load", at)
+    rec.step("intro/name", at, lambda: at.text_input[0].input(pack["profile"]["name"] or "Alex"))
+    rec.step("intro/consent", at, lambda: at.checkbox[0].check())
+    rec.step("intro/start", at, lambda: _click(at, "Starta resan →"))
+
+    at.text_area(key="ground_notes").input(ans["grounding_notes"])
+    rec.step("ground/next", at, lambda: _click(at, "Nästa →"))
+    for i, point in enumerate(ans["timeline_points"]):
+        at.text_input(key=f"tl_{i}").input(point)
+    rec.step("timeline/next", at, lambda: _click(at, "Nästa →"))
+    at.text_area(key="voices_critic").input(ans["inner_critic"])
+    at.text_area(key="voices_ally").input(ans["inner_ally"])
+    rec.step("voices/next", at, lambda: _click(at, "Nästa →"))
+
+    for i, score in enumerate(ans["boundaries_scores"]):
+        rec.step(f"boundaries/slider_{i}", at, lambda i=i, v=score: at.slider(key=f"b_{i}").set_value(v))
+    rec.step("boundaries/next", at, lambda: _click(at, "Nästa →"))
+    for style, items in ATTACHMENT_ITEMS.items():
+        for i, score in enumerate(ans["attachment_scores"][style][:len(items)]):
+            rec.step(f"attachment/{style}_{i}", at,
+                     lambda k=f"a_{style}_{i}", v=score: at.slider(key=k).set_value(v))
+    rec.step("attachment/next", at, lambda: _click(at, "Nästa →"))
+
+    at.multiselect(key="values_chosen").set_value(ans["top_values"])
+    at.text_area(key="values_why").input(ans["values_why"])
+    rec.step("values/next", at, lambda: _click(at, "Nästa →"))
+
+    for idx, card in enumerate(REFLECTION_CARDS):
+        rec.step(f"cards/draw_{idx}", at, lambda: _click(at, "Dra ett kort", contains=True))
+        if card["mode"] == "text":
+            at.text_area(key=f"card_{idx}").input(ans["reflection_cards"].get(str(idx), "…"))
+        else:
+            at.radio(key=f"card_{idx}").set_value(card["choices"][-1])
+    rec.step("cards/next", at, lambda: _click(at, "Nästa →"))
+
+    rec.step("soothing/pick", at, lambda: at.multiselect[0].set_value(ans["soothing_kit"]))
+    rec.step("soothing/next", at, lambda: _click(at, "Nästa →"))
+    at.text_area(key="letter_text").input(ans["self_letter"])
+    rec.step("summary/render_exports", at, lambda: _click(at, "Nästa →"))
+    rec.step("summary/rerun", at)
+    rec.step("summary/share", at, lambda: _click(at, "Skapa delningslänk", contains=True))
+
+    query = {k: v[0] for k, v in at.query_params.items()}
+    if query.get("mode") != "report":
+        raise RuntimeError(f"share link was not written to the URL: {query}")
+    report = AppTest.from_file(APP, default_timeout=60)
+    report.query_params.update(query)
+    rec.step("report/open", report)
+    rec.step("report/reopen_cached", report)
+
+
+def run_suite(repeat: int) -> Dict:
+    timings: Dict[str, List[float]] = {}
+    sizes: Dict[str, int] = {}
+    for _ in range(repeat):
+        rec = Recorder(memory=False)
+        journey(rec)
+        for name, r in rec.steps.items():
+            timings.setdefault(name, []).append(r["time_ms"])
+            sizes[name] = r["elements_bytes"]
+    # Two traced passes; the minimum per step drops one-off warm-up allocations.
+    tracemalloc.start()
+    mem_passes = []
+    for _ in range(2):
+        mem_passes.append(Recorder(memory=True))
+        journey(mem_passes[-1])
+    tracemalloc.stop()
+
+    steps = OrderedDict(
+        (name, {
+            "time_ms": round(statistics.median(t), 3),
+            "alloc_kb": round(min(m.steps[name]["alloc_kb"] for m in mem_passes), 1),
+            "elements_bytes": sizes[name],
+        })
+        for name, t in timings.items()
+    )
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "streamlit": streamlit.__version__,
+            "repeat": repeat,
+            "sections": len({n.split("/")[0] for n in steps}),
+        },
+        "steps": steps,
+        "totals": {m: round(sum(s[m] for s in steps.values()), 1) for m in TOLERANCE},
+    }
+
+
+def compare(result: Dict, baseline: Dict) -> List[str]:
+    """Human-readable regressions of ``result`` against ``baseline``."""
+    out = []
+    rows = list(result["steps"].items()) + [("TOTAL", result["totals"])]
+    base = dict(baseline["steps"], TOTAL=baseline["totals"])
+    for name, cur in rows:
+        old = base.get(name)
+        if old is None:
+            continue
+        for metric in TOLERANCE:
+            if metric not in old or metric not in cur:
+                continue
+            tol = (TOTAL_TOLERANCE if name == "TOTAL" else TOLERANCE)[metric]
+            if cur[metric] > old[metric] * (1 + tol) and cur[metric] - old[metric] > FLOOR[metric]:
+                out.append(f"{name}: {metric} {old[metric]} -> {cur[metric]} (+{cur[metric] / max(old[metric], 1e-9) - 1:.0%})")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", help="write results JSON here (default: stdout)")
+    ap.add_argument("--save-baseline", help="write results as a baseline file")
+    ap.add_argument("--baseline", help="compare against a saved baseline; exit 1 on regressions")
+    args = ap.parse_args()
+
+    streamlit.logger.set_log_level("error")
+    result = run_suite(args.repeat)
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+    if not args.out and not args.save_baseline:
+        print(text)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f))
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Autosave: what a rerun pays, how much the write-behind queue coalesces.
+
+Simulates S sessions doing R reruns each (a slider or a keystroke per rerun,
+like the live sections) against a fresh store and times the rerun-path part
+only: building the field snapshot and ``track()``. The same edits are then
+written synchronously (encrypt + upsert on every rerun) for comparison.
+Finally every session is purged right after a change while other sessions
+keep the writer busy; none of them may be loadable afterwards.
+
+Usage: python benchmarks/bench_autosave.py [--sessions 50] [--reruns 200] [--flush 0.5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import autosave  # noqa: E402
+from answers import AnswerStore  # noqa: E402
+from content import BOUNDARY_STATEMENTS  # noqa: E402
+
+
+def _pct(sorted_vals, q):
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+
+def fields(answers: AnswerStore, profile, step: int):
+    out = {f"answers.{k}": v for k, v in answers.snapshot().items()}
+    out.update(profile=tuple(sorted(profile.items())), step=step, started_at="2024-01-01T00:00:00",
+               card_index=-1)
+    return out
+
+
+def edit(rng: random.Random, answers: AnswerStore, i: int):
+    if i % 2:
+        scores = answers.boundaries() or [5] * len(BOUNDARY_STATEMENTS)
+        scores[rng.randrange(len(scores))] = rng.randint(0, 10)
+        answers.set_boundaries(scores)
+    else:
+        answers.set_text("self_letter", answers.text("self_letter") + rng.choice("abcdefgh "))
+
+
+def simulate(store: autosave.Autosave, sessions: int, reruns: int, seed: int = 1):
+    """Interleaved reruns of all sessions; returns per-rerun latencies (s)."""
+    rng = random.Random(seed)
+    profile = {"name": "", "language": "sv", "consent": True, "private_mode": False, "light_theme": False}
+    state = [(autosave.new_code(), AnswerStore.empty(), {}) for _ in range(sessions)]
+    lat = []
+    for i in range(reruns):
+        for j, (code, answers, last) in enumerate(state):
+            edit(rng, answers, i)
+            t0 = time.perf_counter()
+            last = store.track(code, fields(answers, profile, 9), last)
+            lat.append(time.perf_counter() - t0)
+            state[j] = (code, answers, last)
+    return lat, [code for code, _, _ in state]
+
+
+def sync_baseline(path: str, sessions: int, reruns: int):
+    """Encrypt and write the changed fields inline on every rerun."""
+    store = autosave.Autosave(path, flush_interval_s=3600)
+    orig_track = store.track
+
+    def track(code, f, last):
+        out = orig_track(code, f, last)
+        store.flush()
+        return out
+    store.track = track
+    lat, _ = simulate(store, sessions, reruns)
+    store.close()
+    return lat
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=50)
+    ap.add_argument("--reruns", type=int, default=200)
+    ap.add_argument("--flush", type=float, default=0.5, help="write-behind interval (s)")
+    args = ap.parse_args()
+    if not autosave.AVAILABLE:
+        sys.exit("autosave needs the 'cryptography' package")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = autosave.Autosave(os.path.join(tmp, "wb.db"), flush_interval_s=args.flush)
+        t0 = time.perf_counter()
+        lat, codes = simulate(store, args.sessions, args.reruns)
+        elapsed = time.perf_counter() - t0
+        store.flush()
+        queued = autosave.metrics.value(autosave.QUEUED_METRIC)
+        written = autosave.metrics.value(autosave.WRITES_METRIC)
+        lat.sort()
+        print(f"{args.sessions} sessions x {args.reruns} reruns in {elapsed:.2f}s, flush every {args.flush}s")
+        print(f"{'':>14}{'p50 µs':>9}{'p99 µs':>9}{'max µs':>9}")
+        print(f"{'write-behind':>14}{_pct(lat, .5) * 1e6:>9.1f}{_pct(lat, .99) * 1e6:>9.1f}{lat[-1] * 1e6:>9.0f}")
+        print(f"  fields queued {queued:,.0f}, rows written {written:,.0f} "
+              f"({queued / max(written, 1):.1f}x coalesced)")
+
+        sync = sorted(sync_baseline(os.path.join(tmp, "sync.db"), args.sessions, args.reruns))
+        print(f"{'synchronous':>14}{_pct(sync, .5) * 1e6:>9.1f}{_pct(sync, .99) * 1e6:>9.1f}{sync[-1] * 1e6:>9.0f}")
+
+        # Purge each session right after one more change, while other sessions keep the writer busy.
+        busy = threading.Thread(target=simulate, args=(store, args.sessions, 20, 2), daemon=True)
+        busy.start()
+        purge = []
+        for code in codes:
+            fresh = AnswerStore.empty()
+            fresh.set_text("self_letter", "sista ändringen")
+            store.track(code, fields(fresh, {}, 0), {})
+            t0 = time.perf_counter()
+            store.purge(code)
+            purge.append(time.perf_counter() - t0)
+        busy.join()
+        store.flush()
+        left = sum(store.load(code) is not None for code in codes)
+        purge.sort()
+        print(f"purge: p50 {_pct(purge, .5) * 1e3:.2f} ms, max {purge[-1] * 1e3:.2f} ms; "
+              f"purged sessions still loadable: {left}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
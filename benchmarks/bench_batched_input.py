@@ -0,0 +1,59 @@
+"""Server round-trips per completed journey: live widgets vs form-batched sections.
+
+Runs the real server with MIRRORGARDEN_BATCHED=0 and =1 and walks the full
+journey over the websocket with the same seeded answers.
+
+Batching cuts round-trips per session about 2x, not by an order of
+magnitude. The text sections drop to their floor (navigation and card draws),
+while slider and multiselect sections stay live.
+
+Usage: python benchmarks/bench_batched_input.py [--edits 2] [--users 3]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.journey import Journey  # noqa: E402
+from benchmarks.ws_session import LocalServer, Session, run  # noqa: E402
+from content import SECTIONS  # noqa: E402
+
+BATCHED_SECTIONS = [s["id"] for s in SECTIONS if s.get("batched")]
+
+
+async def _one(url: str, seed: int, batched: bool, edits: int):
+    j = Journey(Session(url), random.Random(seed), batched=batched, edits=edits)
+    await j.run(share=False)
+    await j.s.close()
+    return j
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--edits", type=int, default=2, help="revisions (blurs) per text field")
+    ap.add_argument("--users", type=int, default=3)
+    args = ap.parse_args()
+
+    report = {}
+    for label, flag in (("live", "0"), ("batched", "1")):
+        with LocalServer(env={"MIRRORGARDEN_BATCHED": flag}) as srv:
+            sessions = [run(_one(srv.ws_url, seed, flag == "1", args.edits)) for seed in range(args.users)]
+        report[label] = {
+            "round_trips_per_session": statistics.mean(len(j.runs) for j in sessions),
+            "text_section_round_trips": statistics.mean(
+                sum(len(j.by_section.get(sec, [])) for sec in BATCHED_SECTIONS) for j in sessions),
+            "bytes_per_session": round(statistics.mean(sum(x.bytes for x in j.runs) for j in sessions)),
+            "server_ms_per_session": round(statistics.mean(sum(x.latency_s for x in j.runs) for j in sessions) * 1000),
+        }
+    live, batched = report["live"], report["batched"]
+    for key in ("round_trips_per_session", "text_section_round_trips"):
+        report[f"{key}_ratio"] = round(live[key] / batched[key], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
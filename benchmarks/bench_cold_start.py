@@ -0,0 +1,93 @@
+"""Cold start: time to first paint of the intro screen on a fresh server.
+
+Starts ``--workers`` fresh servers one after another. On each, the first
+session runs the script in a process that has never imported the app
+(process-cold), then ``--sessions`` more sessions open the intro one at a
+time (session-cold: modules and cached resources are warm, session state is
+new). Client-side, each connect is timed until the intro's "Innan vi
+börjar" text arrives (first paint of the intro) and until the run finishes.
+
+The servers run with ``MIRRORGARDEN_PROFILE_COLDSTART=1``, so the app also
+logs per-segment timings for each cold run (see instrumentation). Their
+medians are printed per kind. A tree without that mode (an older checkout
+passed as ``--app``) still gets the client-side numbers.
+
+Usage: python benchmarks/bench_cold_start.py [--workers 5] [--sessions 10] [--app path/to/app.py]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ws_session import APP, LocalServer, Session, run  # noqa: E402
+
+INTRO_TEXT = "Innan vi börjar"
+
+
+def _intro_text(fwd) -> bool:
+    el = fwd.delta.new_element
+    return fwd.delta.WhichOneof("type") == "new_element" and el.WhichOneof("type") == "markdown" \
+        and INTRO_TEXT in el.markdown.body
+
+
+async def _worker(url: str, sessions: int) -> List[Dict[str, object]]:
+    out = []
+    for i in range(sessions + 1):
+        s = Session(url)
+        res = await s.connect(mark=_intro_text)
+        await s.close()
+        if res.mark_s is None:
+            raise RuntimeError("the intro screen never arrived")
+        out.append({"kind": "process" if i == 0 else "session", "intro_ms": res.mark_s * 1000,
+                    "run_ms": res.latency_s * 1000})
+    return out
+
+
+def _median(vals: List[float]) -> float:
+    return round(statistics.median(vals), 1) if vals else 0.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=5, help="fresh servers (process-cold first paints)")
+    ap.add_argument("--sessions", type=int, default=10, help="further sessions per server (session-cold)")
+    ap.add_argument("--app", default=APP, help="app to start (e.g. an older checkout, for a baseline)")
+    args = ap.parse_args()
+
+    client: List[Dict[str, object]] = []
+    server: List[Dict[str, object]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for w in range(args.workers):
+            jsonl = os.path.join(tmp, f"coldstart-{w}.jsonl")
+            env = {"MIRRORGARDEN_PROFILE_COLDSTART": "1", "MIRRORGARDEN_COLDSTART_JSONL": jsonl}
+            with LocalServer(env=env, app=os.path.abspath(args.app)) as srv:
+                client.extend(run(_worker(srv.ws_url, args.sessions)))
+            if os.path.exists(jsonl):
+                with open(jsonl, encoding="utf-8") as fh:
+                    server.extend(json.loads(line) for line in fh)
+
+    print(f"app {args.app}")
+    print(f"{'start':<9}{'n':>5}{'intro p50':>11}{'intro max':>11}{'run p50':>9}   (client ms)")
+    for kind in ("process", "session"):
+        rows = [r for r in client if r["kind"] == kind]
+        intro = [r["intro_ms"] for r in rows]
+        print(f"{kind:<9}{len(rows):>5}{_median(intro):>11}{round(max(intro), 1):>11}"
+              f"{_median([r['run_ms'] for r in rows]):>9}")
+    if not server:
+        print("no cold-start log (app without MIRRORGARDEN_PROFILE_COLDSTART)")
+        return
+    print("server segments, median ms:")
+    for kind in ("process", "session"):
+        rows = [r for r in server if r["start"] == kind]
+        names = list(dict.fromkeys(name for r in rows for name in r["segments_ms"]))
+        cells = "  ".join(f"{n} {_median([r['segments_ms'].get(n, 0.0) for r in rows])}" for n in names)
+        print(f"  {kind:<9}run {_median([r['run_ms'] for r in rows])}  {cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Per-interaction latency and websocket bytes for the slider sections.
+
+Runs the real server twice (MIRRORGARDEN_FRAGMENTS=0 / 1), walks a session
+to "Gränslabb" and "Anknytningskompass", moves every slider a few times and
+reports what each move costs on the wire.
+
+Usage: python benchmarks/bench_fragments.py [--rounds 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ws_session import LocalServer, Session, run  # noqa: E402
+
+
+async def _walk(url: str, rounds: int):
+    s = Session(url)
+    await s.connect()
+    await s.interact("Jag förstår och vill gå vidare.", True)
+    await s.click("Starta resan →")
+    for _ in range(3):
+        await s.click("Nästa →")
+    results = {}
+    for section in ("boundaries", "attachment"):
+        runs = []
+        sliders = [w for w in s.widgets.values() if w.kind == "slider"]
+        for r in range(rounds):
+            for w in sliders:
+                runs.append(await s.interact(w.label, (r * 3 + 7) % 11))
+        results[section] = runs
+        await s.click("Nästa →")
+    await s.close()
+    return results
+
+
+def _summary(runs):
+    lat = sorted(r.latency_s * 1000 for r in runs)
+    return {
+        "interactions": len(runs),
+        "latency_ms_p50": round(statistics.median(lat), 2),
+        "latency_ms_p95": round(lat[int(0.95 * (len(lat) - 1))], 2),
+        "bytes_mean": round(statistics.mean(r.bytes for r in runs)),
+        "deltas_mean": round(statistics.mean(r.deltas for r in runs), 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+
+    report = {}
+    for label, flag in (("full_rerun", "0"), ("fragments", "1")):
+        with LocalServer(env={"MIRRORGARDEN_FRAGMENTS": flag}) as srv:
+            results = run(_walk(srv.ws_url, args.rounds))
+        report[label] = {sec: _summary(runs) for sec, runs in results.items()}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
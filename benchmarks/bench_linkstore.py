@@ -0,0 +1,114 @@
+"""Load test for the short-link store: concurrent resolves (plus a writer).
+
+Fills a fresh SQLite store with synthetic share tokens, then lets T threads
+resolve random IDs (checking every answer against the expected token) while
+one more thread keeps sharing packs at ``--write-rate`` per second, for
+several thread counts and pool sizes. Reports resolves/s, latency
+percentiles and any wrong or failed reads.
+
+Usage: python benchmarks/bench_linkstore.py [--links 5000] [--ops 20000] [--threads 1 4 16] [--pools 1 4]
+                                             [--write-rate 50]
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_packs  # noqa: E402
+from linkstore import LinkStore  # noqa: E402
+from share_codec import _b64decode, encode_share_token  # noqa: E402
+
+
+def _pct(sorted_vals, q):
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+
+def run(store: LinkStore, ids, expected, threads: int, ops: int, writer_tokens, write_rate: float):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    done = threading.Event()
+    writes = [0]
+
+    def resolver(seed: int):
+        rng = random.Random(seed)
+        local = []
+        for _ in range(ops // threads):
+            lid = rng.choice(ids)
+            t0 = time.perf_counter()
+            tok = store.get(lid)
+            local.append(time.perf_counter() - t0)
+            if tok is None or _b64decode(tok) != expected[lid]:
+                errors.append(lid)
+        with lock:
+            latencies.extend(local)
+
+    def writer():
+        for tok in writer_tokens:
+            if done.wait(1 / write_rate):
+                return
+            store.put(tok)
+            writes[0] += 1
+
+    w = threading.Thread(target=writer, daemon=True)
+    workers = [threading.Thread(target=resolver, args=(i,)) for i in range(threads)]
+    t0 = time.perf_counter()
+    w.start()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    done.set()
+    w.join()
+    latencies.sort()
+    return {
+        "resolves_per_s": len(latencies) / elapsed,
+        "p50_us": _pct(latencies, 0.5) * 1e6,
+        "p99_us": _pct(latencies, 0.99) * 1e6,
+        "mean_us": statistics.mean(latencies) * 1e6,
+        "errors": len(errors),
+        "writes": writes[0],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--links", type=int, default=5000)
+    ap.add_argument("--ops", type=int, default=20000, help="resolves per configuration")
+    ap.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--pools", type=int, nargs="+", default=[1, 4])
+    ap.add_argument("--write-rate", type=float, default=50, help="shares per second during the test")
+    args = ap.parse_args()
+
+    tokens = [encode_share_token(p) for p in synthetic_packs(args.links + 2000)]
+    stored, spare = tokens[:args.links], itertools.cycle(tokens[args.links:])
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LinkStore(os.path.join(tmp, "links.db"), max_bytes=1 << 30, pool_size=max(args.pools))
+        ids = [store.put(t) for t in stored]
+        expected = {lid: _b64decode(t) for lid, t in zip(ids, stored)}
+        # Identical packs share one row.
+        assert store.put(stored[0]) == ids[0] and store.stats()["entries"] == len(set(ids))
+        print(f"links: {len(ids)}, stored: {store.stats()['bytes'] / 1024:.0f} KiB, "
+              f"mean token {sum(map(len, stored)) / len(stored):.0f} chars -> id 16 chars")
+        store.close()
+
+        print(f"{'pool':>5}{'threads':>8}{'resolves/s':>12}{'p50 µs':>9}{'p99 µs':>9}{'writes':>8}{'errors':>8}")
+        for pool in args.pools:
+            store = LinkStore(os.path.join(tmp, "links.db"), max_bytes=1 << 30, pool_size=pool)
+            for threads in args.threads:
+                r = run(store, ids, expected, threads, args.ops, spare, args.write_rate)
+                print(f"{pool:>5}{threads:>8}{r['resolves_per_s']:>12,.0f}{r['p50_us']:>9.0f}"
+                      f"{r['p99_us']:>9.0f}{r['writes']:>8}{r['errors']:>8}")
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
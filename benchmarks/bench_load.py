@@ -0,0 +1,172 @@
+"""Many concurrent users on one local server: throughput, latency, CPU and RSS.
+
+Starts ``app.py`` once and ramps through ``--users`` stages. In each stage
+that many simulated browser tabs (:class:`Journey` over the websocket) start
+staggered across ``--ramp-s``, walk every section with exponential think
+time between interactions (sliders, text entry, picks, cards), create a
+share link and open it in a fresh tab, like the person they send it to.
+The server process is sampled from ``/proc`` while the stage runs.
+
+Per stage it reports completed journeys, reruns per second, rerun latency
+percentiles (interactions and report opens separately), errors, server CPU
+(share of one core) and peak RSS. The clients run in this process on the
+same machine, so on small hosts they compete with the server for CPU; keep
+that in mind before reading the highest stages as server limits.
+
+Everything stays on 127.0.0.1; nothing is fetched from the network.
+
+Usage: python benchmarks/bench_load.py [--users 1,5,10,20] [--think-ms 300] [--ramp-s 5] [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.journey import Journey  # noqa: E402
+from benchmarks.ws_session import LocalServer, RunResult, Session, run  # noqa: E402
+
+_TICK = os.sysconf("SC_CLK_TCK")
+
+
+# --------- SERVER SAMPLING ---------
+def _cpu_s(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as fh:
+        fields = fh.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / _TICK  # utime + stime
+
+
+def _rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class ProcSampler:
+    """Peak RSS and CPU time of one process between ``start()`` and ``stop()``."""
+
+    def __init__(self, pid: int, interval_s: float = 0.25):
+        self.pid = pid
+        self.interval_s = interval_s
+        self.rss_peak_mb = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._t0, self._cpu0 = time.perf_counter(), _cpu_s(self.pid)
+        self.rss_start_mb = self.rss_peak_mb = _rss_mb(self.pid)
+        self._task = asyncio.ensure_future(self._poll())
+
+    async def _poll(self):
+        while True:
+            self.rss_peak_mb = max(self.rss_peak_mb, _rss_mb(self.pid))
+            await asyncio.sleep(self.interval_s)
+
+    def stop(self) -> Dict[str, float]:
+        self._task.cancel()
+        wall = time.perf_counter() - self._t0
+        self.rss_peak_mb = max(self.rss_peak_mb, _rss_mb(self.pid))
+        return {"cpu_pct": round(100 * (_cpu_s(self.pid) - self._cpu0) / wall, 1),
+                "rss_start_mb": round(self.rss_start_mb, 1), "rss_peak_mb": round(self.rss_peak_mb, 1)}
+
+
+# --------- ONE USER ---------
+async def _user(url: str, seed: int, delay_s: float, think_ms: float) -> Dict[str, object]:
+    rng = random.Random(seed)
+    await asyncio.sleep(delay_s)
+
+    async def think():
+        await asyncio.sleep(rng.expovariate(1000 / think_ms) if think_ms > 0 else 0)
+
+    j = Journey(Session(url), rng, think=think)
+    out: Dict[str, object] = {"runs": j.runs, "report": None, "error": None}
+    try:
+        query = await j.run(share=True)
+        await think()
+        viewer = Session(url, query_string=query or "")
+        out["report"] = await viewer.connect()
+        if not any("Delad insiktskarta" in md for md in viewer.markdown):
+            out["error"] = "share link did not open the report view"
+        await viewer.close()
+    except Exception as e:  # one broken user should not end the stage
+        out["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        await j.s.close()
+    return out
+
+
+# --------- STAGES ---------
+def _pct(vals: List[float], q: float) -> float:
+    vals = sorted(vals)
+    return round(vals[min(len(vals) - 1, int(q * len(vals)))], 1) if vals else 0.0
+
+
+async def _stage(srv: LocalServer, users: int, think_ms: float, ramp_s: float, seed: int) -> Dict[str, object]:
+    sampler = ProcSampler(srv.proc.pid)
+    sampler.start()
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(
+        _user(srv.ws_url, seed + i, ramp_s * i / users, think_ms) for i in range(users)))
+    wall = time.perf_counter() - t0
+    server = sampler.stop()
+
+    runs: List[RunResult] = [r for res in results for r in res["runs"]]
+    reports: List[RunResult] = [res["report"] for res in results if res["report"] is not None]
+    lat = [r.latency_s * 1000 for r in runs]
+    rep = [r.latency_s * 1000 for r in reports]
+    errors = [res["error"] for res in results if res["error"]]
+    return {
+        "users": users,
+        "journeys": users - len(errors),
+        "errors": errors,
+        "wall_s": round(wall, 1),
+        "reruns": len(runs) + len(reports),
+        "reruns_per_s": round((len(runs) + len(reports)) / wall, 1),
+        "rerun_ms": {"p50": _pct(lat, .5), "p95": _pct(lat, .95), "p99": _pct(lat, .99), "max": _pct(lat, 1)},
+        "report_open_ms": {"p50": _pct(rep, .5), "p95": _pct(rep, .95)},
+        "kb_per_rerun": round(sum(r.bytes for r in runs) / max(len(runs), 1) / 1024, 1),
+        **server,
+    }
+
+
+def _print(stage: Dict[str, object]):
+    r = stage["rerun_ms"]
+    print(f"{stage['users']:>6}{stage['journeys']:>9}{stage['reruns_per_s']:>10}"
+          f"{r['p50']:>8}{r['p95']:>8}{r['p99']:>8}{stage['report_open_ms']['p95']:>10}"
+          f"{stage['cpu_pct']:>7}{stage['rss_peak_mb']:>9}")
+    for err in stage["errors"]:
+        print(f"        error: {err}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", default="1,5,10,20", help="comma-separated concurrent users per stage")
+    ap.add_argument("--think-ms", type=float, default=300.0, help="mean think time between interactions")
+    ap.add_argument("--ramp-s", type=float, default=5.0, help="spread of user start times within a stage")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", help="also write the stage results to this file")
+    args = ap.parse_args()
+    stages = [int(n) for n in args.users.split(",")]
+
+    report = []
+    with LocalServer() as srv:
+        print(f"server pid {srv.proc.pid}, idle RSS {_rss_mb(srv.proc.pid):.1f} MB, think {args.think_ms:.0f} ms")
+        print(f"{'users':>6}{'done':>9}{'reruns/s':>10}{'p50':>8}{'p95':>8}{'p99':>8}{'report95':>10}"
+              f"{'cpu%':>7}{'rss MB':>9}")
+        for i, users in enumerate(stages):
+            stage = run(_stage(srv, users, args.think_ms, args.ramp_s, args.seed + 1000 * i))
+            _print(stage)
+            report.append(stage)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Quick Exit: time from the button press to the first paint of the safe screen.
+
+Starts the real server, opens fresh sessions (some on the intro, some a few
+steps into the journey), presses "⚡ Quick Exit" and times the round-trip
+until the safe-screen text delta arrives and until the run finishes. The
+bundled image is then fetched from the static route like a browser would.
+
+Asserts that the safe screen references no remote URL, that the image is
+served with a long-lived Cache-Control, and that the p95 press -> safe text
+stays under ``--budget-ms``.
+
+Usage: python benchmarks/bench_quick_exit.py [--sessions 30] [--budget-ms 100]
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ws_session import LocalServer, Session, run  # noqa: E402
+
+QUICK_EXIT = "⚡ Quick Exit"
+
+
+def _safe_text(fwd) -> bool:
+    el = fwd.delta.new_element
+    return fwd.delta.WhichOneof("type") == "new_element" and el.WhichOneof("type") == "alert" \
+        and "trygg" in el.alert.body
+
+
+async def _press(url: str, steps: int):
+    s = Session(url)
+    await s.connect()
+    if steps:
+        await s.interact("Jag förstår och vill gå vidare.", True)
+        await s.click("Starta resan →")
+        for _ in range(steps - 1):
+            await s.click("Nästa →")
+    res = await s.click(QUICK_EXIT, mark=_safe_text)
+    markdown = list(s.markdown)
+    await s.close()
+    return res, markdown
+
+
+def _fetch(port: int, src: str):
+    t0 = time.perf_counter()
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/{src}", timeout=5) as r:
+        body = r.read()
+        headers = dict(r.headers)
+    return time.perf_counter() - t0, len(body), headers
+
+
+def _pct(vals, q):
+    vals = sorted(vals)
+    return vals[min(len(vals) - 1, int(q * len(vals)))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=30)
+    ap.add_argument("--budget-ms", type=float, default=100.0)
+    args = ap.parse_args()
+
+    with LocalServer() as srv:
+        paint, done, deltas, markdown = [], [], [], []
+        for i in range(args.sessions):
+            res, markdown = run(_press(srv.ws_url, i % 4))
+            assert res.mark_s is not None, "safe screen never painted"
+            paint.append(res.mark_s * 1000)
+            done.append(res.latency_s * 1000)
+            deltas.append(res.deltas)
+        srcs = [src for md in markdown for src in re.findall(r"src='([^']+)'", md)]
+        assert srcs and not any("://" in src for src in srcs), srcs
+        fetches = [_fetch(srv.port, srcs[0]) for _ in range(5)]
+
+    cold_s, size, headers = fetches[0]
+    max_age = int(re.search(r"max-age=(\d+)", headers.get("Cache-Control", "max-age=0")).group(1))
+    print(f"sessions: {args.sessions}, deltas per safe run: {statistics.median(deltas):.0f}")
+    print(f"press -> safe text  p50 {_pct(paint, .5):6.1f} ms   p95 {_pct(paint, .95):6.1f} ms")
+    print(f"press -> run done   p50 {_pct(done, .5):6.1f} ms   p95 {_pct(done, .95):6.1f} ms")
+    print(f"image {srcs[0]}: {size} B, {headers.get('Content-Type')}, "
+          f"first fetch {cold_s * 1000:.1f} ms, Cache-Control: {headers.get('Cache-Control')}")
+    assert max_age >= 365 * 86400, headers
+    assert _pct(paint, .95) <= args.budget_ms, f"p95 {_pct(paint, .95):.1f} ms over budget {args.budget_ms} ms"
+    print(f"OK: no remote URLs, cached for {max_age // 86400} days, within {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
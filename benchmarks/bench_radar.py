@@ -0,0 +1,77 @@
+"""Radar chart cost: drawing the SVG vs serving it from the process cache.
+
+Times ``radar.radar_svg`` and a cache hit, then replays a traffic mix
+through a ``BoundedTTLCache`` keyed like the app's ``radar_cache``: summary
+reruns of ``--sessions`` synthetic sessions (each chart viewed several
+times) plus ``--opens`` report-link opens drawn Zipf-like from those
+sessions' links. Reports draws per request and the cache's hit ratio.
+
+Usage: python benchmarks/bench_radar.py [--sessions 2000] [--opens 20000] [--reruns 4]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_packs  # noqa: E402
+from cache import BoundedTTLCache  # noqa: E402
+from content import catalog  # noqa: E402
+from scoring import DIMENSIONS  # noqa: E402
+import radar  # noqa: E402
+
+LABELS = tuple(catalog().dimension_labels[dim] for dim, _ in DIMENSIONS)
+
+
+def _us(fn, n=2000) -> float:
+    return min(timeit.repeat(fn, number=n, repeat=5)) / n * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=2000)
+    ap.add_argument("--opens", type=int, default=20000)
+    ap.add_argument("--reruns", type=int, default=4, help="summary renders per session")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    packs = list(synthetic_packs(args.sessions, seed=11))
+    keys = [(radar.quantize(p["scores"]), "light" if p["profile"].get("light_theme") else "dark", LABELS)
+            for p in packs]
+    # Report packs are untrusted: out-of-range scores are clamped, never overflow.
+    dims = [dim for dim, _ in DIMENSIONS]
+    assert radar.quantize(dict.fromkeys(dims, 1e308)) == (100,) * len(dims)
+    assert radar.quantize(dict.fromkeys(dims, -1e308)) == radar.quantize(dict.fromkeys(dims, -3.5)) == (0,) * len(dims)
+    sample = keys[0]
+    svg = radar.radar_svg(*sample)
+    cache = BoundedTTLCache("radar", max_entries=2048, max_bytes=8 * 1024 * 1024, ttl_s=86400)
+    cache.put(sample, svg, len(svg))
+    print(f"svg {len(svg)} B, draw {_us(lambda: radar.radar_svg(*sample)):.1f} us, "
+          f"cache hit {_us(lambda: cache.get(sample)):.2f} us")
+
+    cache = BoundedTTLCache("radar", max_entries=2048, max_bytes=8 * 1024 * 1024, ttl_s=86400)
+    draws = 0
+
+    def build(key):
+        nonlocal draws
+        draws += 1
+        out = radar.radar_svg(*key)
+        return out, len(out)
+
+    rng = random.Random(3)
+    weights = [1 / (i + 1) for i in range(len(keys))]  # a few links are shared widely
+    requests = [k for k in keys for _ in range(args.reruns)] + rng.choices(keys, weights, k=args.opens)
+    for key in requests:
+        cache.get_or_build(key, lambda: build(key))
+    stats = cache.stats()
+    print(f"requests {len(requests)}, distinct charts {len(set(keys))}, draws {draws} "
+          f"({draws / len(requests):.1%} of requests), hit ratio {stats['hit_ratio']:.1%}, "
+          f"cache {stats['entries']} entries / {stats['bytes'] / 1024:.0f} KiB "
+          f"(setup {time.perf_counter() - t0:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
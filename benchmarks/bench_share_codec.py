@@ -0,0 +1,55 @@
+"""Compare v1 and v2 share tokens: URL length and encode/decode time.
+
+Checks that v2 round-trips and stays about 2x shorter than v1 overall (2.3x
+on the default corpus, where free text dominates; see share_codec).
+
+Usage: python benchmarks/bench_share_codec.py [--packs 500]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import synthetic_packs  # noqa: E402
+from share_codec import (  # noqa: E402
+    encode_v1, encode_share_token, decode_share_token, VERSION_V2, _b64decode,
+)
+
+
+def _timed(fn, items):
+    out = []
+    t0 = time.perf_counter()
+    for it in items:
+        out.append(fn(it))
+    return out, (time.perf_counter() - t0) / max(len(items), 1) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--packs", type=int, default=500)
+    args = ap.parse_args()
+
+    packs = list(synthetic_packs(args.packs))
+    v1, v1_enc = _timed(encode_v1, packs)
+    v2, v2_enc = _timed(encode_share_token, packs)
+    _, v1_dec = _timed(decode_share_token, v1)
+    decoded, v2_dec = _timed(decode_share_token, v2)
+
+    assert all(_b64decode(t)[0] == VERSION_V2 for t in v2), "some packs fell back to v1"
+    assert all(d["answers"] == p["answers"] for d, p in zip(decoded, packs)), "v2 roundtrip mismatch"
+
+    l1 = [len(t) for t in v1]
+    l2 = [len(t) for t in v2]
+    print(f"packs: {len(packs)}")
+    print(f"{'':10}{'median len':>12}{'max len':>10}{'enc µs':>10}{'dec µs':>10}")
+    print(f"{'v1':10}{statistics.median(l1):>12.0f}{max(l1):>10}{v1_enc:>10.1f}{v1_dec:>10.1f}")
+    print(f"{'v2':10}{statistics.median(l2):>12.0f}{max(l2):>10}{v2_enc:>10.1f}{v2_dec:>10.1f}")
+    print(f"v2/v1 total length: {sum(l2) / sum(l1):.1%} ({sum(l1) / sum(l2):.1f}x shorter)")
+    assert sum(l1) / sum(l2) >= 2, "v2 is no longer ~2x shorter than v1"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Stylesheet bytes per full rerun: inline every run vs. cached references.
+
+The stylesheet is minified once per theme (``themes.style_tag``). With the
+repo's ``global.minCachedMessageSize`` the server sends it in full only the
+first time a session sees it (and after a theme switch) and a hash
+reference otherwise; ``--baseline`` runs the same walk with Streamlit's
+default 10 KB threshold, i.e. the full stylesheet on every full rerun.
+
+The walk: open the app, accept, then "Nästa →" through every section
+(each is a full rerun), flipping the light theme twice on the way.
+
+Usage: python benchmarks/bench_stylesheet.py
+"""
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ws_session import LocalServer, Session, run  # noqa: E402
+from content import SECTIONS  # noqa: E402
+import themes  # noqa: E402
+
+CONFIGS = {
+    "inline every run": {"STREAMLIT_GLOBAL_MIN_CACHED_MESSAGE_SIZE": "10000"},
+    "cached reference": {},
+}
+
+
+async def _walk(url: str):
+    s = Session(url)
+    runs = [await s.connect()]
+    await s.interact("Jag förstår och vill gå vidare.", True)
+    runs.append(await s.click("Starta resan →"))
+    for i in range(len(SECTIONS) - 2):
+        if i in (2, 5):
+            runs.append(await s.interact("Ljust tema", i == 2))
+        if not s.has("Nästa →"):  # reflection cards: draw one first
+            runs.append(await s.click("Dra ett kort", contains=True))
+        runs.append(await s.click("Nästa →"))
+    await s.close()
+    return runs
+
+
+def main():
+    raw = len(themes._CSS.substitute(themes.THEMES["dark"]).encode("utf-8"))
+    tag = len(themes.style_tag("dark").encode("utf-8"))
+    print(f"stylesheet: {raw} B as written, {tag} B minified ({1 - tag / raw:.0%} smaller), "
+          f"built once per theme per process")
+    results = {}
+    for label, env in CONFIGS.items():
+        with LocalServer(env=env) as srv:
+            results[label] = run(_walk(srv.ws_url))
+    print(f"{'':>18}{'full runs':>10}{'bytes/run':>11}{'refs/run':>10}")
+    for label, runs in results.items():
+        print(f"{label:>18}{len(runs):>10}{statistics.mean(r.bytes for r in runs):>11,.0f}"
+              f"{statistics.mean(r.refs for r in runs):>10.1f}")
+    base, new = (statistics.mean(r.bytes for r in results[k]) for k in CONFIGS)
+    print(f"saved per full rerun: {base - new:,.0f} B ({(base - new) / base:.0%})")
+
+
+if __name__ == "__main__":
+    main()
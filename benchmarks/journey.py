@@ -0,0 +1,111 @@
+"""A scripted user walking the whole MirrorGarden journey over the websocket."""
+import asyncio
+import random
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from benchmarks.synthetic import _sentence
+from benchmarks.ws_session import RunResult, Session
+from content import REFLECTION_CARDS, SOOTHING_OPTIONS, VALUES_POOL
+
+NEXT = "Nästa →"
+
+
+class Journey:
+    """Drives one :class:`Session` through all sections, recording every round-trip.
+
+    ``batched`` mirrors the server's MIRRORGARDEN_BATCHED setting: form widgets
+    are then only changed locally and sent with the "Nästa →" submit, exactly
+    like the browser. ``edits`` is how many times each text field is revised
+    (each revision is a blur, i.e. one rerun, in live mode).
+    """
+
+    def __init__(self, session: Session, rng: random.Random, batched: bool = True,
+                 edits: int = 2, think: Callable[[], Awaitable[None]] = None):
+        self.s = session
+        self.rng = rng
+        self.batched = batched
+        self.edits = edits
+        self.think = think or (lambda: asyncio.sleep(0))
+        self.runs: List[RunResult] = []
+        self.by_section: Dict[str, List[RunResult]] = {}
+        self.section = "intro"
+
+    async def _rerun(self, coro) -> RunResult:
+        await self.think()
+        res = await coro
+        self.runs.append(res)
+        self.by_section.setdefault(self.section, []).append(res)
+        return res
+
+    async def next(self, section: str):
+        """Press "Nästa →" (counted towards the section being left)."""
+        await self.click(NEXT)
+        self.section = section
+
+    async def type(self, label: str, form: bool):
+        for _ in range(self.edits):
+            text = _sentence(self.rng, 4, 30)
+            if form and self.batched:
+                self.s.set_value(self.s.widget(label), text)
+            else:
+                await self._rerun(self.s.interact(label, text))
+
+    async def pick(self, label: str, options: List[str], n: int, form: bool):
+        chosen: List[str] = []
+        for opt in self.rng.sample(options, n):
+            chosen.append(opt)
+            if form and self.batched:
+                self.s.set_value(self.s.widget(label), list(chosen))
+            else:
+                await self._rerun(self.s.interact(label, list(chosen)))
+
+    async def slide_all(self):
+        for w in [w for w in self.s.widgets.values() if w.kind == "slider"]:
+            await self._rerun(self.s.interact(w.label, self.rng.randint(0, 10)))
+
+    async def click(self, label: str, contains: bool = False) -> RunResult:
+        return await self._rerun(self.s.click(label, contains))
+
+    async def run(self, share: bool = True) -> Optional[str]:
+        """Walk intro → summary; returns the share query string if ``share``."""
+        await self._rerun(self.s.connect())
+        await self.type("Vad vill du bli kallad?", form=False)
+        await self._rerun(self.s.interact("Jag förstår och vill gå vidare.", True))
+        await self.click("Starta resan →")
+        self.section = "ground"
+
+        await self.type("Skriv 3 saker du märker just nu:", form=True)
+        await self.next("timeline")
+        for i in range(3):
+            await self.type(f"Nedslag {i+1}", form=True)
+        await self.next("voices")
+        await self.type("Inre kritiker – vad säger den?", form=True)
+        await self.type("Inre allierad – hur svarar den?", form=True)
+        await self.next("boundaries")
+        await self.slide_all()
+        await self.next("attachment")
+        await self.slide_all()
+        await self.next("values")
+        await self.pick("Välj dina ord:", VALUES_POOL, self.rng.randint(3, 6), form=True)
+        await self.type("Varför dessa? Koppla gärna till din livslinje.", form=True)
+        await self.next("cards")
+        for card in REFLECTION_CARDS:
+            await self.click("Dra ett kort", contains=True)
+            if card["mode"] == "text":
+                await self.type("Ditt svar:", form=True)
+            else:
+                w = self.s.widget("Välj ett alternativ:")
+                choice = self.rng.choice(card["choices"])
+                if self.batched:
+                    self.s.set_value(w, choice)
+                else:
+                    await self._rerun(self.s.interact(w.label, choice))
+        await self.next("soothing")
+        await self.pick("Snabbhjälp:", SOOTHING_OPTIONS, self.rng.randint(3, 5), form=False)
+        await self.next("letter")
+        await self.type("Skriv fritt:", form=True)
+        await self.next("summary")
+        if not share:
+            return None
+        await self.click("Skapa delningslänk", contains=True)
+        return self.s.query_string
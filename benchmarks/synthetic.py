@@ -0,0 +1,65 @@
+"""Seeded generator of realistic MirrorGarden export packs for benchmarks."""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator
+
+from content import (
+    BOUNDARY_STATEMENTS, ATTACHMENT_ITEMS, VALUES_POOL, SOOTHING_OPTIONS, REFLECTION_CARDS,
+)
+from scoring import compute_scores
+from core import APP_NAME, APP_VERSION
+
+_WORDS = (
+    "jag känner mig trygg när det är lugnt hemma och jag får vila utan krav "
+    "ibland blir jag orolig när någon inte svarar och då behöver jag andas "
+    "min vän lyssnar alltid och det betyder mycket för mig i vardagen "
+    "jag vill sätta gränser på jobbet och våga säga nej utan att skämmas "
+    "framtida jag kommer minnas att det var modigt att börja om"
+).split()
+
+
+def _sentence(rng: random.Random, lo: int, hi: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(lo, hi))).capitalize() + "."
+
+
+def synthetic_pack(rng: random.Random) -> Dict[str, Any]:
+    started = datetime(2026, 1, 1) + timedelta(seconds=rng.randint(0, 300 * 86400))
+    answers: Dict[str, Any] = {
+        "grounding_notes": "\n".join(f"{i}) {_sentence(rng, 2, 6)}" for i in (1, 2, 3)),
+        "timeline_points": [_sentence(rng, 3, 10) for _ in range(3)],
+        "inner_critic": _sentence(rng, 4, 20),
+        "inner_ally": _sentence(rng, 4, 20),
+        "boundaries_scores": [rng.randint(0, 10) for _ in BOUNDARY_STATEMENTS],
+        "attachment_scores": {s: [rng.randint(0, 10) for _ in items] for s, items in ATTACHMENT_ITEMS.items()},
+        "top_values": rng.sample(VALUES_POOL, rng.randint(1, 6)),
+        "values_why": _sentence(rng, 5, 30),
+        "reflection_cards": {
+            str(i): (rng.choice(c["choices"]) if c["mode"] == "choice" else _sentence(rng, 3, 25))
+            for i, c in enumerate(REFLECTION_CARDS) if rng.random() < 0.6
+        },
+        "soothing_kit": rng.sample(SOOTHING_OPTIONS, rng.randint(3, 5)),
+        "self_letter": " ".join(_sentence(rng, 5, 15) for _ in range(rng.randint(1, 8))),
+    }
+    return {
+        "meta": {
+            "app": APP_NAME,
+            "version": APP_VERSION,
+            "started_at": started.isoformat(),
+            "exported_at": (started + timedelta(minutes=rng.randint(5, 40))).isoformat(),
+        },
+        "profile": {
+            "name": rng.choice(["", "Alex", "Sam", "Kim", "Robin"]),
+            "language": "sv",
+            "consent": True,
+            "private_mode": rng.random() < 0.5,
+            "light_theme": rng.random() < 0.3,
+        },
+        "answers": answers,
+        "scores": compute_scores(answers),
+    }
+
+
+def synthetic_packs(n: int, seed: int = 7) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield synthetic_pack(rng)
@@ -0,0 +1,253 @@
+"""Minimal headless Streamlit client speaking the browser websocket protocol.
+
+Starts ``app.py`` with ``streamlit run`` on a local port and drives sessions
+the way the frontend does: a ``BackMsg.rerun_script`` carrying the current
+widget states (and a fragment id for fragment reruns), then reading
+``ForwardMsg`` deltas until the run finishes. Like the browser, it keeps
+messages the server marks cacheable and resolves later ``ref_hash`` messages
+from that cache. Everything stays on 127.0.0.1.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+# Element type -> WidgetState field the frontend fills for it.
+WIDGET_VALUE_FIELDS = {
+    "slider": "double_array_value",
+    "checkbox": "bool_value",
+    "text_input": "string_value",
+    "text_area": "string_value",
+    "multiselect": "int_array_value",
+    "radio": "int_value",
+    "button": "trigger_value",
+    "download_button": "trigger_value",
+}
+
+_FINAL_STATUSES = {
+    ForwardMsg.FINISHED_SUCCESSFULLY,
+    ForwardMsg.FINISHED_WITH_COMPILE_ERROR,
+    ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalServer:
+    """``streamlit run app.py`` on a free local port, as a context manager."""
+
+    def __init__(self, env: Optional[Dict[str, str]] = None, app: str = APP):
+        self.port = free_port()
+        self.app = app
+        self.env = {**os.environ, **(env or {})}
+        self.proc: Optional[subprocess.Popen] = None
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def __enter__(self) -> "LocalServer":
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", self.app,
+             "--server.headless", "true", "--server.port", str(self.port),
+             "--server.address", "127.0.0.1", "--browser.gatherUsageStats", "false",
+             "--server.fileWatcherType", "none", "--global.developmentMode", "false"],
+            cwd=ROOT, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1) as r:
+                    if r.read() == b"ok":
+                        return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError("streamlit server did not become healthy")
+
+    def __exit__(self, *exc):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+@dataclass
+class Widget:
+    id: str
+    kind: str
+    label: str
+    fragment_id: str = ""
+    options: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RunResult:
+    latency_s: float
+    bytes: int
+    messages: int
+    deltas: int
+    status: int
+    mark_s: Optional[float] = None  # when the ``mark`` delta arrived, if one did
+    refs: int = 0                   # deltas received as cache references
+
+
+class Session:
+    """One simulated browser tab."""
+
+    def __init__(self, url: str, query_string: str = ""):
+        self.url = url
+        self.query_string = query_string
+        self.widgets: Dict[str, Widget] = {}
+        self.states: Dict[str, WidgetState] = {}
+        self.markdown: List[str] = []
+        self._msg_cache: Dict[str, ForwardMsg] = {}
+        self._conn = None
+
+    async def connect(self, mark: Optional[Callable[[ForwardMsg], bool]] = None) -> RunResult:
+        self._conn = await websocket_connect(self.url, subprotocols=["streamlit"])
+        return await self.rerun(mark=mark)
+
+    async def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # --------- widget state ---------
+    def widget(self, label: str, contains: bool = False) -> Widget:
+        for w in self.widgets.values():
+            if w.label == label or (contains and label in w.label):
+                return w
+        raise KeyError(label)
+
+    def has(self, label: str, contains: bool = False) -> bool:
+        try:
+            self.widget(label, contains)
+            return True
+        except KeyError:
+            return False
+
+    def set_value(self, w: Widget, value: Any):
+        ws = WidgetState(id=w.id)
+        kind = WIDGET_VALUE_FIELDS[w.kind]
+        if kind == "double_array_value":
+            ws.double_array_value.data[:] = [float(value)]
+        elif kind == "int_array_value":
+            ws.int_array_value.data[:] = [w.options.index(v) for v in value]
+        elif kind == "int_value":
+            ws.int_value = w.options.index(value) if isinstance(value, str) else int(value)
+        else:
+            setattr(ws, kind, value)
+        self.states[w.id] = ws
+
+    async def interact(self, label: str, value: Any = True, contains: bool = False,
+                       mark: Optional[Callable[[ForwardMsg], bool]] = None) -> RunResult:
+        """Change one widget and rerun its fragment (or the whole script)."""
+        w = self.widget(label, contains)
+        self.set_value(w, value)
+        return await self.rerun(fragment_id=w.fragment_id, mark=mark)
+
+    async def click(self, label: str, contains: bool = False,
+                    mark: Optional[Callable[[ForwardMsg], bool]] = None) -> RunResult:
+        return await self.interact(label, True, contains, mark)
+
+    # --------- protocol ---------
+    async def rerun(self, fragment_id: str = "", mark: Optional[Callable[[ForwardMsg], bool]] = None) -> RunResult:
+        """One script (or fragment) run; ``mark`` timestamps the first delta it accepts."""
+        msg = BackMsg()
+        cs = msg.rerun_script
+        cs.query_string = self.query_string
+        cs.widget_states.widgets.extend(self.states.values())
+        if fragment_id:
+            cs.fragment_id = fragment_id
+        # Triggers only fire once, like the frontend.
+        self.states = {k: v for k, v in self.states.items() if v.WhichOneof("value") != "trigger_value"}
+
+        t0 = time.perf_counter()
+        await self._conn.write_message(msg.SerializeToString(), binary=True)
+        n_bytes = n_msgs = n_deltas = n_refs = 0
+        mark_s = None
+        seen: Dict[str, Widget] = {}
+        markdown: List[str] = []
+        while True:
+            raw = await self._conn.read_message()
+            if raw is None:
+                raise ConnectionError("server closed the websocket")
+            n_bytes += len(raw)
+            n_msgs += 1
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind == "ref_hash":
+                ref = fwd
+                fwd = ForwardMsg()
+                fwd.CopyFrom(self._msg_cache[ref.ref_hash])
+                fwd.metadata.CopyFrom(ref.metadata)
+                kind = fwd.WhichOneof("type")
+                n_refs += 1
+            elif fwd.metadata.cacheable:
+                self._msg_cache[fwd.hash] = fwd
+            if kind == "delta":
+                n_deltas += 1
+                if mark is not None and mark_s is None and mark(fwd):
+                    mark_s = time.perf_counter() - t0
+                self._collect(fwd, seen, markdown)
+            elif kind == "page_info_changed":
+                self.query_string = fwd.page_info_changed.query_string
+            elif kind == "script_finished":
+                if fwd.script_finished in _FINAL_STATUSES:
+                    status = fwd.script_finished
+                    break
+                # Aborted by st.rerun(): the frontend drops that run's elements.
+                seen.clear()
+                markdown.clear()
+        latency = time.perf_counter() - t0
+
+        if status == ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY:
+            self.widgets.update(seen)
+            self.markdown.extend(markdown)
+        else:
+            self.widgets = seen
+            self.markdown = markdown
+            self.states = {k: v for k, v in self.states.items() if k in seen}
+        return RunResult(latency, n_bytes, n_msgs, n_deltas, status, mark_s, n_refs)
+
+    @staticmethod
+    def _collect(fwd: ForwardMsg, seen: Dict[str, Widget], markdown: List[str]):
+        if fwd.delta.WhichOneof("type") != "new_element":
+            return
+        el = fwd.delta.new_element
+        etype = el.WhichOneof("type")
+        if etype == "markdown":
+            markdown.append(el.markdown.body)
+        if etype not in WIDGET_VALUE_FIELDS:
+            return
+        proto = getattr(el, etype)
+        seen[proto.id] = Widget(
+            id=proto.id, kind=etype, label=proto.label,
+            fragment_id=fwd.delta.fragment_id,
+            options=list(getattr(proto, "options", [])),
+        )
+
+
+def run(coro):
+    return asyncio.run(coro)
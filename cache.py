@@ -0,0 +1,103 @@
+"""Small thread-safe LRU cache with TTL and byte budget, shared across sessions.
+
+Streamlit re-executes ``app.py`` on every rerun, so instances should be held
+by an imported module or an ``st.cache_resource`` factory to live for the
+whole process.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import metrics
+
+REQUESTS_METRIC = "mirrorgarden_cache_requests_total"
+EVICTIONS_METRIC = "mirrorgarden_cache_evictions_total"
+metrics.describe(REQUESTS_METRIC, "Cache lookups by cache name and result (hit/miss).")
+metrics.describe(EVICTIONS_METRIC, "Cache entries dropped by cache name and cause (lru/ttl).")
+
+
+class BoundedTTLCache:
+    """LRU bounded by entry count and approximate bytes; entries expire after ``ttl_s``."""
+
+    def __init__(self, name: str, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024,
+                 ttl_s: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, size, value)
+        self._data: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] < self._clock():
+                self._drop(key, "expirations")
+                item = None
+            if item is None:
+                self._stats["misses"] += 1
+            else:
+                self._data.move_to_end(key)
+                self._stats["hits"] += 1
+        metrics.inc(REQUESTS_METRIC, {"cache": self.name, "result": "miss" if item is None else "hit"})
+        return default if item is None else item[2]
+
+    def put(self, key: Hashable, value: Any, size: int = 1):
+        """Store ``value``; ``size`` is the caller's byte estimate for the budget."""
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        evicted = 0
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (self._clock() + self.ttl_s, size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)), "evictions")
+                evicted += 1
+        if evicted:
+            metrics.inc(EVICTIONS_METRIC, {"cache": self.name, "cause": "lru"}, evicted)
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Optional[Tuple[Any, int]]]) -> Any:
+        """Return the cached value or ``build()``'s ``(value, size)``; ``None`` results are not cached."""
+        sentinel = object()
+        hit = self.get(key, sentinel)
+        if hit is not sentinel:
+            return hit
+        built = build()
+        if built is None:
+            return None
+        value, size = built
+        self.put(key, value, size)
+        return value
+
+    def _drop(self, key: Hashable, stat: Optional[str] = None):
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+        if stat:
+            self._stats[stat] += 1
+            if stat == "expirations":
+                metrics.inc(EVICTIONS_METRIC, {"cache": self.name, "cause": "ttl"})
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hit_ratio": self._stats["hits"] / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,140 @@
+"""MirrorGarden content, one catalog per language (``catalogs/<lang>.json``).
+
+``catalog(lang)`` compiles a language on first use into an immutable
+``Catalog`` (tuples and read-only mappings of interned strings, plus
+id -> index maps) that every session in the process then shares. Languages
+that nobody uses are never read, so adding one costs nothing at startup.
+
+The default language is canonical: answers, exports, share tokens and
+analytics identify statements, values, options and card choices by its
+text or position. Other catalogs must have the same shape and only change
+what is displayed (``value_label`` etc. translate a canonical entry). The
+module-level tables below are the canonical ones, for the data layer.
+"""
+import functools
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogs")
+DEFAULT_LANGUAGE = "sv"
+_LANG_RE = re.compile(r"^[a-z]{2,3}(-[A-Z]{2})?$")
+
+
+@dataclass(frozen=True)
+class Catalog:
+    language: str
+    name: str
+    # "batched": widgets live in an st.form and answers are committed once, on "Nästa →".
+    sections: Tuple[Mapping[str, Any], ...]
+    section_index: Mapping[str, int]
+    boundary_statements: Tuple[str, ...]
+    attachment_items: Mapping[str, Tuple[str, ...]]  # canonical style -> items
+    attachment_labels: Mapping[str, str]             # canonical style -> heading shown
+    values: Tuple[str, ...]
+    soothing: Tuple[str, ...]
+    cards: Tuple[Mapping[str, Any], ...]
+    dimension_labels: Mapping[str, str]              # canonical dimension -> label shown
+    report: Mapping[str, Any]
+    _value_labels: Mapping[str, str]                 # canonical text -> text shown
+    _soothing_labels: Mapping[str, str]
+    _choice_labels: Mapping[str, str]
+
+    def value_label(self, canonical: str) -> str:
+        return self._value_labels.get(canonical, canonical)
+
+    def soothing_label(self, canonical: str) -> str:
+        return self._soothing_labels.get(canonical, canonical)
+
+    def choice_label(self, canonical: str) -> str:
+        return self._choice_labels.get(canonical, canonical)
+
+
+def _freeze(obj: Any) -> Any:
+    """JSON value -> tuples, read-only mappings and interned strings."""
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    if isinstance(obj, dict):
+        return MappingProxyType({sys.intern(k): _freeze(v) for k, v in obj.items()})
+    return obj
+
+
+def _shape(raw: Dict[str, Any]):
+    return ([s["id"] for s in raw["sections"]], len(raw["boundary_statements"]),
+            [(a["style"], len(a["items"])) for a in raw["attachment"]], len(raw["values"]),
+            len(raw["soothing"]), [(c["mode"], len(c.get("choices", ()))) for c in raw["cards"]],
+            sorted(raw["dimensions"]), sorted(raw["report"]["dimensions"]))
+
+
+def _compile(raw: Dict[str, Any], canonical: Optional[Dict[str, Any]]) -> Catalog:
+    ref = canonical or raw
+    if _shape(raw) != _shape(ref):
+        raise ValueError(f"catalog {raw.get('language')!r} does not match the {DEFAULT_LANGUAGE!r} layout")
+    f = _freeze(raw)
+
+    def labels(ref_items, items):
+        return MappingProxyType({sys.intern(c): d for c, d in zip(ref_items, items)})
+
+    ref_choices = [c for card in ref["cards"] for c in card.get("choices", ())]
+    choices = [c for card in f["cards"] for c in card.get("choices", ())]
+    return Catalog(
+        language=f["language"],
+        name=f["name"],
+        sections=f["sections"],
+        section_index=MappingProxyType({s["id"]: i for i, s in enumerate(f["sections"])}),
+        boundary_statements=f["boundary_statements"],
+        attachment_items=MappingProxyType({a["style"]: a["items"] for a in f["attachment"]}),
+        attachment_labels=MappingProxyType({a["style"]: a["label"] for a in f["attachment"]}),
+        values=f["values"],
+        soothing=f["soothing"],
+        cards=f["cards"],
+        dimension_labels=f["dimensions"],
+        report=f["report"],
+        _value_labels=labels(ref["values"], f["values"]),
+        _soothing_labels=labels(ref["soothing"], f["soothing"]),
+        _choice_labels=labels(ref_choices, choices),
+    )
+
+
+def _load(lang: str) -> Dict[str, Any]:
+    with open(os.path.join(CATALOG_DIR, f"{lang}.json"), encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def available_languages() -> Tuple[str, ...]:
+    """Language codes with a catalog file (nothing is parsed)."""
+    return tuple(sorted(n[:-5] for n in os.listdir(CATALOG_DIR) if n.endswith(".json") and _LANG_RE.match(n[:-5])))
+
+
+LANGUAGES = frozenset(available_languages())
+
+
+@functools.lru_cache(maxsize=None)
+def _catalog(lang: str) -> Catalog:
+    if lang == DEFAULT_LANGUAGE:
+        return _compile(_load(lang), None)
+    return _compile(_load(lang), _load(DEFAULT_LANGUAGE))
+
+
+def catalog(lang: Optional[str] = None) -> Catalog:
+    """The compiled catalog for ``lang``; unknown languages (or non-strings) get the default."""
+    return _catalog(lang if isinstance(lang, str) and lang in LANGUAGES else DEFAULT_LANGUAGE)
+
+
+# --------- CANONICAL TABLES ---------
+_DEFAULT = catalog(DEFAULT_LANGUAGE)
+SECTIONS = _DEFAULT.sections
+SECTION_INDEX = _DEFAULT.section_index
+BOUNDARY_STATEMENTS = _DEFAULT.boundary_statements
+ATTACHMENT_ITEMS = _DEFAULT.attachment_items
+VALUES_POOL = _DEFAULT.values
+SOOTHING_OPTIONS = _DEFAULT.soothing
+REFLECTION_CARDS = _DEFAULT.cards
+VALUE_INDEX = MappingProxyType({v: i for i, v in enumerate(VALUES_POOL)})
+SOOTHING_INDEX = MappingProxyType({v: i for i, v in enumerate(SOOTHING_OPTIONS)})
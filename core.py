@@ -0,0 +1,58 @@
+"""Streamlit-free core: export packs, scores and the markdown report.
+
+Everything here takes and returns plain packs (the ``mirror-garden.json``
+export format), so it runs the same inside the app, in ``batch.py`` and in
+benchmarks without booting the UI.
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from content import catalog
+from scoring import DIMENSIONS, compute_scores
+
+APP_NAME = "MirrorGarden"
+APP_VERSION = "1.2.0"
+
+
+def build_pack(profile: Dict[str, Any], answers: Dict[str, Any], started_at: str,
+               exported_at: Optional[str] = None, scores: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Assemble an export pack; ``scores`` are computed from ``answers`` unless given."""
+    return {
+        "meta": {
+            "app": APP_NAME,
+            "version": APP_VERSION,
+            "started_at": started_at,
+            "exported_at": exported_at or datetime.utcnow().isoformat(),
+        },
+        "profile": profile,
+        "answers": answers,
+        "scores": compute_scores(answers) if scores is None else scores,
+    }
+
+
+def rescore(pack: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of ``pack`` with scores recomputed from its answers."""
+    return {**pack, "scores": compute_scores(pack.get("answers", {}))}
+
+
+def make_markdown_report(data: Dict[str, Any]) -> str:
+    """The shareable markdown report, in the pack's ``profile.language`` (default if unknown)."""
+    p = data.get("profile", {})
+    cat = catalog(p.get("language"))
+    t = cat.report
+    empty = t["empty"]
+    answers = data.get("answers", {})
+    scores = data.get("scores", {})
+    vals = [cat.value_label(v) for v in answers.get("top_values", [])]
+    soothing = [cat.soothing_label(x) for x in answers.get("soothing_kit", [])]
+    letter = answers.get("self_letter", "").strip()
+    tl = answers.get("timeline_points", [])
+    highlights = [f"- {t['dimensions'][dim]}: **{scores.get(dim, 0):.1f}/10**" for dim, _ in DIMENSIONS]
+    return "\n".join(t["template"]).format(
+        name=p.get("name") or t["default_name"],
+        highlights="\n".join(highlights),
+        values=", ".join(vals) if vals else empty,
+        soothing="\n".join(f"- {x}" for x in soothing) if soothing else empty,
+        timeline="\n".join(f"- {x}" for x in tl) if tl else empty,
+        letter=letter if letter else empty,
+    )
@@ -0,0 +1,223 @@
+"""Opt-in per-rerun phase timings.
+
+Enabled for every session with ``MIRRORGARDEN_PROFILE=1``, or for a single
+session that opens the app with ``?debug=<MIRRORGARDEN_DEBUG_TOKEN>`` (which
+also shows the debug panel). Timings go into the process-wide
+``mirrorgarden_phase_seconds`` histogram in ``metrics``, so every session
+feeds the same p50/p95/p99 and the periodic metrics flush picks them up.
+
+When disabled, ``phase`` returns a shared no-op context and ``timed``
+wrappers cost one thread-local attribute lookup.
+
+Cold-start profiling (``MIRRORGARDEN_PROFILE_COLDSTART=1``) times only cold
+runs: the first script run of the process (``start="process"``: it pays the
+imports) and the first run of every new session (``start="session"``). Each
+one records its consecutive segments (``mark``: imports, setup, ... summing to
+the whole run) and the phases timed inside it, exactly, into
+``mirrorgarden_coldstart_seconds``, the debug panel and, with
+``MIRRORGARDEN_COLDSTART_JSONL``, one JSON line per cold run.
+"""
+import collections
+import contextlib
+import functools
+import hmac
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import streamlit as st
+
+import metrics
+
+PHASE_METRIC = "mirrorgarden_phase_seconds"
+SESSION_BYTES_METRIC = "mirrorgarden_session_answers_bytes"
+COLDSTART_METRIC = "mirrorgarden_coldstart_seconds"
+metrics.describe(PHASE_METRIC, "Wall time per rerun phase (bootstrap, inject_css, render_*, exports, ...).")
+metrics.describe(SESSION_BYTES_METRIC, "Estimated bytes held by a session's answer store, sampled per full run.")
+metrics.describe(COLDSTART_METRIC, "Segments and phases of cold runs (first run of the process / of a session).")
+
+ENV_ENABLED = os.environ.get("MIRRORGARDEN_PROFILE", "0") == "1"
+DEBUG_TOKEN = os.environ.get("MIRRORGARDEN_DEBUG_TOKEN", "")
+COLDSTART_ENABLED = os.environ.get("MIRRORGARDEN_PROFILE_COLDSTART", "0") == "1"
+COLDSTART_JSONL = os.environ.get("MIRRORGARDEN_COLDSTART_JSONL", "")
+
+_KEY = "_instrumentation"
+_COLD_KEY = "_instrumentation_cold"
+_NULL = contextlib.nullcontext()
+
+
+class _Flag(threading.local):
+    """Script runs happen on a per-session thread, so the flag lives there; it
+    is mirrored in session_state for fragment reruns, which skip begin_run."""
+    on = False       # time phases at all
+    steady = False   # ... into the per-rerun histogram (MIRRORGARDEN_PROFILE / admin)
+    cold = ""        # "process" / "session" while a cold run is profiled
+    last_ns = 0
+    segments: Dict[str, int] = {}
+    phases: Dict[str, int] = {}
+
+
+_local = _Flag()
+_cold_lock = threading.Lock()
+_process_cold = True
+_cold_runs: "collections.deque" = collections.deque(maxlen=20)
+
+
+def is_admin(token: Optional[str]) -> bool:
+    # Compared as bytes: compare_digest refuses non-ASCII str (e.g. ?debug=å).
+    return bool(DEBUG_TOKEN and token) and hmac.compare_digest(token.encode("utf-8"), DEBUG_TOKEN.encode("utf-8"))
+
+
+def start_run(started_ns: int):
+    """Right after app.py's imports: decide whether this is a cold run to profile
+    (``started_ns`` was taken before the imports, so they are its first segment)."""
+    global _process_cold
+    _local.cold = ""
+    if not COLDSTART_ENABLED:
+        return
+    with _cold_lock:
+        cold, _process_cold = ("process" if _process_cold else ""), False
+    if not cold and _COLD_KEY not in st.session_state:
+        cold = "session"
+    st.session_state[_COLD_KEY] = True
+    _local.cold, _local.last_ns, _local.segments, _local.phases = cold, started_ns, {}, {}
+    _local.on = bool(cold)
+    mark("imports")
+
+
+def mark(segment: str):
+    """End the current segment of a cold run (no-op otherwise)."""
+    if _local.cold:
+        now = time.perf_counter_ns()
+        _local.segments[segment] = _local.segments.get(segment, 0) + now - _local.last_ns
+        _local.last_ns = now
+
+
+def end_run():
+    """Close a cold run: record its last segment and publish the whole run."""
+    if not _local.cold:
+        return
+    mark("finish")
+    cold, _local.cold = _local.cold, ""
+    report = {"start": cold, "ts": time.time(),
+              "segments_ms": {k: v / 1e6 for k, v in _local.segments.items()},
+              "phases_ms": {k: v / 1e6 for k, v in _local.phases.items()}}
+    report["run_ms"] = sum(report["segments_ms"].values())
+    for kind in ("segments", "phases"):
+        for name, ns in getattr(_local, kind).items():
+            metrics.observe(COLDSTART_METRIC, ns / 1e9, {"start": cold, "kind": kind[:-1], "name": name})
+    _cold_runs.append(report)
+    if COLDSTART_JSONL:
+        try:
+            with open(COLDSTART_JSONL, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+    _local.on = _local.steady
+
+
+def cold_runs() -> list:
+    """The most recent cold-run reports (newest last)."""
+    return list(_cold_runs)
+
+
+def begin_run(admin: bool, started_ns: int):
+    """Decide enablement for this session's run and record the bootstrap phase."""
+    steady = ENV_ENABLED or admin
+    st.session_state[_KEY] = (steady, admin)
+    _local.steady = steady
+    _local.on = steady or bool(_local.cold)
+    if _local.on:
+        record("bootstrap", time.perf_counter_ns() - started_ns)
+    mark("setup")
+
+
+def resume_run():
+    """Restore the session's flag at the start of a fragment (a cold full run stays cold)."""
+    _local.steady = st.session_state.get(_KEY, (False, False))[0]
+    _local.on = _local.steady or bool(_local.cold)
+
+
+def show_panel() -> bool:
+    return st.session_state.get(_KEY, (False, False))[1]
+
+
+def record_session_bytes(nbytes: Callable[[], int]):
+    """Sample the session's answer footprint (``nbytes`` is only called when on)."""
+    if _local.on:
+        metrics.observe(SESSION_BYTES_METRIC, nbytes(), buckets=metrics.BYTE_BUCKETS)
+
+
+def record(name: str, elapsed_ns: int):
+    if _local.steady:
+        metrics.observe(PHASE_METRIC, elapsed_ns / 1e9, {"phase": name})
+    if _local.cold:
+        _local.phases[name] = _local.phases.get(name, 0) + elapsed_ns
+
+
+class _Phase:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter_ns() - self.t0)
+        return False
+
+
+def phase(name: str):
+    """``with phase("header"): ...`` times the block when instrumentation is on."""
+    return _Phase(name) if _local.on else _NULL
+
+
+def timed(name: str) -> Callable:
+    """Decorator variant of ``phase``; st.rerun/st.stop still record the time spent."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            if not _local.on:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter_ns() - t0)
+        return run
+    return wrap
+
+
+def render_debug_panel():
+    """Per-phase latency table for admin sessions (process-wide numbers)."""
+    if not show_panel():
+        return
+    rows = metrics.histogram_summary(PHASE_METRIC)
+    with st.expander("🛠️ Debug: fastider per omkörning (ms, hela processen)", expanded=False):
+        if rows:
+            # Plain markdown: no dataframe/arrow round-trip for a debug view.
+            table = ["| fas | antal | p50 | p95 | p99 |", "|---|---:|---:|---:|---:|"]
+            table += [f"| {r['phase']} | {r['count']} | {r['p50'] * 1000:.3f} | "
+                      f"{r['p95'] * 1000:.3f} | {r['p99'] * 1000:.3f} |" for r in rows]
+            st.markdown("\n".join(table))
+        else:
+            st.caption("Inga mätningar än.")
+        cold = [r for r in _cold_runs if r["start"] == "process"][-1:] + [r for r in _cold_runs if r["start"] == "session"][-1:]
+        if cold:
+            table = ["| kallstart | " + " | ".join(r["start"] for r in cold) + " |", "|---|" + "---:|" * len(cold)]
+            names = list(dict.fromkeys(n for r in cold for n in r["segments_ms"]))
+            table += [f"| {n} | " + " | ".join(f"{r['segments_ms'].get(n, 0):.2f}" for r in cold) + " |" for n in names]
+            table.append("| **hela körningen** | " + " | ".join(f"{r['run_ms']:.2f}" for r in cold) + " |")
+            st.markdown("\n".join(table))
+        mem = metrics.histogram_summary(SESSION_BYTES_METRIC)
+        if mem:
+            p95 = mem[0]["p95"]
+            st.caption(f"Svarsdata per session: p50 {mem[0]['p50'] / 1024:.1f} KiB, p95 {p95 / 1024:.1f} KiB "
+                       f"(≈ {(1 << 30) / max(p95, 1):,.0f} sessioner/GiB för svaren).")
+        targets = [p for p in (metrics.METRICS_PATH, metrics.JSONL_PATH) if p]
+        st.caption("Skrivs till: " + ", ".join(targets) if targets else
+                   "Sätt MIRRORGARDEN_METRICS_PATH / MIRRORGARDEN_METRICS_JSONL för fil-export.")
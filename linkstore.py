@@ -0,0 +1,163 @@
+"""Content-addressed short links for shared reports (SQLite, WAL mode).
+
+``put(token)`` stores a share token (see ``share_codec``) under a short ID
+derived from its SHA-256, so identical packs are stored once and re-sharing
+just refreshes the entry. ``get(id)`` returns the token, which the caller
+decodes with the usual bounded decoder, so a stored link is never trusted
+more than an inline ``r=`` token.
+
+Entries expire ``ttl_s`` after their last put; when the stored bytes exceed
+``max_bytes`` the oldest entries are evicted first. Resolves borrow a
+connection from a small pool (one thread per connection at a time); puts go
+through one dedicated writer connection behind a lock, so rare shares never
+queue behind a burst of resolves. WAL lets readers and the writer overlap.
+"""
+import base64
+import contextlib
+import hashlib
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+import metrics
+from share_codec import _b64decode, _b64encode
+
+ID_CHARS = 16  # 96 bits of the digest
+_ID_RE = re.compile(rf"^[A-Za-z0-9_-]{{{ID_CHARS}}}$")
+
+OPS_METRIC = "mirrorgarden_linkstore_ops_total"
+EVICTIONS_METRIC = "mirrorgarden_linkstore_evictions_total"
+metrics.describe(OPS_METRIC, "Short-link store operations by op and result.")
+metrics.describe(EVICTIONS_METRIC, "Short links removed, by cause (expired, size).")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    id      TEXT PRIMARY KEY,
+    blob    BLOB NOT NULL,
+    size    INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS links_created ON links (created);
+-- Running total of links.size, kept in the same transactions, so puts never scan.
+CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (k, v) SELECT 'bytes', COALESCE(SUM(size), 0) FROM links;
+"""
+
+
+def link_id(token: str) -> str:
+    digest = hashlib.sha256(token.encode("ascii")).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii")[:ID_CHARS]
+
+
+def is_link_id(value: Optional[str]) -> bool:
+    return bool(value) and _ID_RE.match(value) is not None
+
+
+class LinkStore:
+    """Thread-safe short-link store backed by one SQLite file."""
+
+    def __init__(self, path: str, ttl_s: float = 30 * 86400, max_bytes: int = 64 * 1024 * 1024,
+                 pool_size: int = 4, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._writer = self._connect()
+        self._write_lock = threading.Lock()
+        with self._write_lock:
+            self._writer.executescript(_SCHEMA)
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    @contextlib.contextmanager
+    def _conn(self) -> Iterator[sqlite3.Connection]:
+        db = self._pool.get()
+        try:
+            yield db
+        finally:
+            self._pool.put(db)
+
+    def put(self, token: str) -> str:
+        """Store ``token`` and return its short ID (same token, same ID)."""
+        lid = link_id(token)
+        blob = _b64decode(token)
+        now = self.clock()
+        with self._write_lock:
+            db = self._writer
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                cur = db.execute("UPDATE links SET created = ? WHERE id = ?", (now, lid))
+                if cur.rowcount:
+                    result = "dedup"
+                else:
+                    db.execute("INSERT INTO links (id, blob, size, created) VALUES (?, ?, ?, ?)",
+                               (lid, blob, len(blob), now))
+                    self._add_bytes(db, len(blob))
+                    result = "stored"
+                self._evict(db, now)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        metrics.inc(OPS_METRIC, {"op": "put", "result": result})
+        return lid
+
+    @staticmethod
+    def _add_bytes(db: sqlite3.Connection, delta: int) -> int:
+        return db.execute("UPDATE meta SET v = v + ? WHERE k = 'bytes' RETURNING v", (delta,)).fetchone()[0]
+
+    def _evict(self, db: sqlite3.Connection, now: float):
+        cutoff = now - self.ttl_s
+        expired, freed = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM links WHERE created < ?",
+                                    (cutoff,)).fetchone()
+        if expired:
+            db.execute("DELETE FROM links WHERE created < ?", (cutoff,))
+            metrics.inc(EVICTIONS_METRIC, {"cause": "expired"}, by=expired)
+        total = self._add_bytes(db, -freed)
+        evicted = 0
+        while total > self.max_bytes:
+            row = db.execute("SELECT id, size FROM links ORDER BY created LIMIT 1").fetchone()
+            if row is None:
+                break
+            db.execute("DELETE FROM links WHERE id = ?", (row[0],))
+            total = self._add_bytes(db, -row[1])
+            evicted += 1
+        if evicted:
+            metrics.inc(EVICTIONS_METRIC, {"cause": "size"}, by=evicted)
+
+    def get(self, lid: str) -> Optional[str]:
+        """The token stored under ``lid``; None if unknown, expired, malformed or unreadable."""
+        if not is_link_id(lid):
+            metrics.inc(OPS_METRIC, {"op": "get", "result": "invalid"})
+            return None
+        try:
+            with self._conn() as db:
+                row = db.execute("SELECT blob FROM links WHERE id = ? AND created >= ?",
+                                 (lid, self.clock() - self.ttl_s)).fetchone()
+        except sqlite3.Error:
+            metrics.inc(OPS_METRIC, {"op": "get", "result": "error"})
+            return None
+        metrics.inc(OPS_METRIC, {"op": "get", "result": "hit" if row else "miss"})
+        return _b64encode(row[0]) if row else None
+
+    def stats(self):
+        with self._conn() as db:
+            n, = db.execute("SELECT COUNT(*) FROM links").fetchone()
+            total, = db.execute("SELECT v FROM meta WHERE k = 'bytes'").fetchone()
+        return {"entries": n, "bytes": total}
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+        with self._write_lock:
+            self._writer.close()
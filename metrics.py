@@ -0,0 +1,192 @@
+"""Process-wide counters and histograms shared by all sessions.
+
+Set ``MIRRORGARDEN_METRICS_PATH`` to have the Prometheus text exposition
+written to a file, and/or ``MIRRORGARDEN_METRICS_JSONL`` to append one JSON
+snapshot per flush (with p50/p95/p99 per histogram). Flushes happen at most
+once per ``MIRRORGARDEN_METRICS_INTERVAL`` seconds, piggybacking on updates.
+"""
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+METRICS_PATH = os.environ.get("MIRRORGARDEN_METRICS_PATH", "")
+JSONL_PATH = os.environ.get("MIRRORGARDEN_METRICS_JSONL", "")
+FLUSH_INTERVAL_S = float(os.environ.get("MIRRORGARDEN_METRICS_INTERVAL", "10"))
+
+# Seconds; roughly logarithmic from 25µs to 5s.
+DEFAULT_BUCKETS = (
+    25e-6, 50e-6, 100e-6, 250e-6, 500e-6, 1e-3, 2.5e-3, 5e-3, 10e-3,
+    25e-3, 50e-3, 100e-3, 250e-3, 500e-3, 1.0, 2.5, 5.0,
+)
+# Bytes; powers of two from 256 B to 1 MiB.
+BYTE_BUCKETS = tuple(float(1 << i) for i in range(8, 21))
+QUANTILES = (0.5, 0.95, 0.99)
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_lock = threading.Lock()
+_counters: Dict[_Key, float] = {}
+_help: Dict[str, str] = {}
+_last_flush = 0.0  # guarded by _lock
+_flush_lock = threading.Lock()  # one writer of the exposition / JSONL at a time
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v: float):
+        self.counts[bisect.bisect_left(self.bounds, v)] += 1
+        self.sum += v
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding rank q."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = self.bounds[i - 1] if i else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.bounds[-1]
+
+
+_histograms: Dict[_Key, _Histogram] = {}
+
+
+def _key(name: str, labels: Optional[Dict[str, str]]) -> _Key:
+    return (name, tuple(sorted((labels or {}).items())))
+
+
+def describe(name: str, text: str):
+    _help[name] = text
+
+
+def inc(name: str, labels: Optional[Dict[str, str]] = None, by: float = 1):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + by
+    maybe_flush()
+
+
+def observe(name: str, v: float, labels: Optional[Dict[str, str]] = None,
+            buckets: Sequence[float] = DEFAULT_BUCKETS):
+    key = _key(name, labels)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = _Histogram(buckets)
+        h.observe(v)
+    maybe_flush()
+
+
+def value(name: str, labels: Optional[Dict[str, str]] = None) -> float:
+    return _counters.get(_key(name, labels), 0)
+
+
+def histogram_summary(name: str) -> List[Dict[str, float]]:
+    """One row per label set: labels, count, mean and the QUANTILES (seconds)."""
+    with _lock:
+        items = [(labels, h) for (n, labels), h in sorted(_histograms.items()) if n == name]
+        rows = []
+        for labels, h in items:
+            row: Dict = dict(labels)
+            row.update(count=h.count, mean=h.sum / h.count if h.count else 0.0)
+            row.update({f"p{int(q * 100)}": h.quantile(q) for q in QUANTILES})
+            rows.append(row)
+    return rows
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render_prometheus() -> str:
+    with _lock:
+        counters = sorted(_counters.items())
+        hists = sorted((k, list(h.counts), h.bounds, h.sum, h.count) for k, h in _histograms.items())
+    lines = []
+    seen = set()
+
+    def header(name: str, kind: str):
+        if name not in seen:
+            seen.add(name)
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), v in counters:
+        header(name, "counter")
+        lines.append(f"{name}{_labels(labels)} {v:g}")
+    for (name, labels), counts, bounds, total, count in hists:
+        header(name, "histogram")
+        cum = 0
+        for bound, c in zip(bounds, counts):
+            cum += c
+            le = f'le="{bound:g}"'
+            lines.append(f"{name}_bucket{_labels(labels, le)} {cum}")
+        inf = 'le="+Inf"'
+        lines.append(f"{name}_bucket{_labels(labels, inf)} {count}")
+        lines.append(f"{name}_sum{_labels(labels)} {total:g}")
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot() -> Dict:
+    with _lock:
+        counters = {f"{n}{_labels(l)}": v for (n, l), v in sorted(_counters.items())}
+        names = sorted({n for n, _ in _histograms})
+    return {
+        "ts": time.time(),
+        "counters": counters,
+        "histograms": {n: histogram_summary(n) for n in names},
+    }
+
+
+def flush(path: str = METRICS_PATH, jsonl_path: str = JSONL_PATH):
+    """Atomically write the exposition to ``path``; append a snapshot to ``jsonl_path``."""
+    with _flush_lock:
+        if path:
+            fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                       dir=os.path.dirname(os.path.abspath(path)))
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(render_prometheus())
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        if jsonl_path:
+            with open(jsonl_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(snapshot(), ensure_ascii=False) + "\n")
+
+
+def maybe_flush():
+    global _last_flush
+    if not (METRICS_PATH or JSONL_PATH):
+        return
+    now = time.monotonic()
+    with _lock:
+        if now - _last_flush < FLUSH_INTERVAL_S:
+            return
+        _last_flush = now
+    try:
+        flush()
+    except OSError:
+        pass
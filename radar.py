@@ -0,0 +1,58 @@
+"""The Insiktskarta radar chart as a small SVG string (no plotting library).
+
+``quantize`` turns scores into the chart's identity: tenths in
+``DIMENSIONS`` order, the resolution the summary shows. ``radar_svg`` draws
+from that, so callers memoize on ``(quantize(scores), theme, labels)`` and a
+chart is only ever drawn once per distinct picture (see ``radar_cache`` in
+report.py).
+"""
+import html
+import math
+from typing import Mapping, Sequence, Tuple
+
+from scoring import DIMENSIONS
+from themes import THEMES, theme_name
+
+SIZE = (440, 270)
+_CX, _CY, _R = 220, 150, 100
+_RINGS = (2, 4, 6, 8, 10)
+_LABEL_AT = 11.8  # label distance from the centre, in score units
+
+
+def quantize(scores: Mapping[str, float]) -> Tuple[int, ...]:
+    """Scores in ``DIMENSIONS`` order, clamped to 0–10 before scaling (report packs are
+    untrusted; 1e308 * 10 would overflow), as tenths (0–100)."""
+    return tuple(int(round(min(max(scores.get(dim, 0), 0), 10) * 10)) for dim, _ in DIMENSIONS)
+
+
+def _point(i: int, value: float) -> Tuple[float, float]:
+    angle = -math.pi / 2 + 2 * math.pi * i / len(DIMENSIONS)
+    r = _R * value / 10
+    return _CX + r * math.cos(angle), _CY + r * math.sin(angle)
+
+
+def _points(values: Sequence[float]) -> str:
+    return " ".join(f"{x:.1f},{y:.1f}" for x, y in (_point(i, v) for i, v in enumerate(values)))
+
+
+def radar_svg(tenths: Sequence[int], theme: str, labels: Sequence[str]) -> str:
+    """Chart for ``quantize``d scores; ``labels`` are the dimension names shown, in ``DIMENSIONS`` order."""
+    c = THEMES[theme_name(theme)]
+    values = [t / 10 for t in tenths]
+    w, h = SIZE
+    out = [f"<svg xmlns='http://www.w3.org/2000/svg' width='{w}' height='{h}' viewBox='0 0 {w} {h}' "
+           f"font-family='sans-serif' font-size='12'>"]
+    for ring in _RINGS:
+        out.append(f"<polygon points='{_points([ring] * len(values))}' fill='none' stroke='{c['border']}'/>")
+    for i in range(len(values)):
+        x, y = _point(i, 10)
+        out.append(f"<line x1='{_CX}' y1='{_CY}' x2='{x:.1f}' y2='{y:.1f}' stroke='{c['border']}'/>")
+    out.append(f"<polygon points='{_points(values)}' fill='{c['accent']}' fill-opacity='0.35' "
+               f"stroke='{c['accent']}' stroke-width='2' stroke-linejoin='round'/>")
+    for i, (label, v) in enumerate(zip(labels, values)):
+        x, y = _point(i, _LABEL_AT)
+        anchor = "middle" if abs(x - _CX) < 1 else "start" if x > _CX else "end"
+        out.append(f"<text x='{x:.1f}' y='{y - 7:.1f}' text-anchor='{anchor}' fill='{c['text']}'>"
+                   f"{html.escape(label)}<tspan x='{x:.1f}' dy='14' fill='{c['sub']}'>{v:.1f}</tspan></text>")
+    out.append("</svg>")
+    return "".join(out)
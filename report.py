@@ -0,0 +1,233 @@
+"""The end of the journey: exports, share links, the radar chart and the shared report view.
+
+Only the summary step and ``?mode=report`` links need any of this, so app.py
+imports the module on first use. The intro screen then loads without the
+share codec, the link store (sqlite3), the radar drawing and these helpers'
+cached resources.
+"""
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Optional, Tuple
+
+import streamlit as st
+
+import core
+import metrics
+import radar
+import url_state
+from cache import BoundedTTLCache
+from instrumentation import timed
+from linkstore import LinkStore
+from scoring import DIMENSIONS
+from share_codec import decode_share_token, shareable_token
+from url_state import url_clear, url_get
+
+
+# --------- SCORING ---------
+@timed("polar_scores")
+def polar_scores() -> Dict[str, float]:
+    """O(1): the answer store keeps running slider sums."""
+    return st.session_state.answers.scores()
+
+
+# --------- EXPORT ---------
+@timed("export_pack")
+def export_pack() -> Dict[str, Any]:
+    return core.build_pack(
+        st.session_state.profile,
+        st.session_state.answers.to_dict(),
+        st.session_state.started_at,
+        scores=polar_scores(),
+    )
+
+
+EXPORT_BUILDS_METRIC = "mirrorgarden_export_builds_total"
+metrics.describe(EXPORT_BUILDS_METRIC, "Export artefacts built (pack, markdown, json, share_token); reuse is free.")
+
+
+def answers_key() -> Tuple:
+    """Answer store + its change version + profile: exports are rebuilt only when it changes.
+    Holds the store itself (compared by identity), so a resumed session never matches."""
+    s = st.session_state
+    return (s.answers, s.answers.version, tuple(sorted(s.profile.items())))
+
+
+class Exports:
+    """Export artefacts of one answer state, each built on first use and then reused
+    by the download buttons, the share link and later reruns."""
+    def __init__(self, key: Tuple):
+        self.key = key
+
+    def _built(self, artefact: str):
+        metrics.inc(EXPORT_BUILDS_METRIC, {"artefact": artefact})
+
+    @functools.cached_property
+    def pack(self) -> Dict[str, Any]:
+        self._built("pack")
+        return export_pack()
+
+    @functools.cached_property
+    def markdown(self) -> bytes:
+        self._built("markdown")
+        return make_markdown_report(self.pack).encode("utf-8")
+
+    @functools.cached_property
+    def json(self) -> bytes:
+        self._built("json")
+        return json.dumps(self.pack, ensure_ascii=False, indent=2).encode("utf-8")
+
+    @functools.cached_property
+    def share_token(self) -> Optional[str]:
+        """``None`` when the answers are too long for a link this app can open again."""
+        self._built("share_token")
+        return shareable_token(self.pack)
+
+
+def current_exports() -> Exports:
+    key = answers_key()
+    ex = st.session_state.get("_exports")
+    if ex is None or ex.key != key:
+        ex = st.session_state._exports = Exports(key)
+    return ex
+
+
+@timed("make_markdown_report")
+def make_markdown_report(data: Optional[Dict[str, Any]] = None) -> str:
+    if data is None:
+        data = current_exports().pack
+    return core.make_markdown_report(data)
+
+
+# --------- RADAR CHART ---------
+@st.cache_resource
+def radar_cache() -> BoundedTTLCache:
+    """Process-wide cache of radar SVGs per quantized scores, theme and labels."""
+    return BoundedTTLCache(
+        "radar",
+        max_entries=int(os.environ.get("MIRRORGARDEN_RADAR_CACHE_ENTRIES", "2048")),
+        max_bytes=int(os.environ.get("MIRRORGARDEN_RADAR_CACHE_BYTES", str(8 * 1024 * 1024))),
+        ttl_s=float(os.environ.get("MIRRORGARDEN_RADAR_CACHE_TTL", str(24 * 3600))),
+    )
+
+
+@timed("render_radar")
+def render_radar(scores: Dict[str, float], labels: Dict[str, str]):
+    """Radar chart of the five dimensions; drawn once per distinct picture per process."""
+    theme = "light" if st.session_state.profile.get("light_theme") else "dark"
+    key = (radar.quantize(scores), theme, tuple(labels[dim] for dim, _ in DIMENSIONS))
+    def build():
+        svg = radar.radar_svg(*key)
+        return svg, len(svg)
+    st.image(radar_cache().get_or_build(key, build), width=radar.SIZE[0])
+
+
+# --------- SHARE / REPORT HELPERS ---------
+@st.cache_resource
+def link_store() -> Optional[LinkStore]:
+    """Server-side short links; opt-in with MIRRORGARDEN_SHARE_STORE=<sqlite path>."""
+    path = os.environ.get("MIRRORGARDEN_SHARE_STORE", "")
+    if not path:
+        return None
+    try:
+        return LinkStore(
+            path,
+            ttl_s=float(os.environ.get("MIRRORGARDEN_SHARE_STORE_TTL", str(30 * 86400))),
+            max_bytes=int(os.environ.get("MIRRORGARDEN_SHARE_STORE_BYTES", str(64 * 1024 * 1024))),
+            pool_size=int(os.environ.get("MIRRORGARDEN_SHARE_STORE_POOL", "4")),
+        )
+    except (sqlite3.Error, OSError):
+        return None  # unusable path: share links fall back to inline ``r=`` tokens
+
+
+@timed("pack_share_data")
+def pack_share_data() -> Optional[Dict[str, str]]:
+    """URL params for a share link: ``s=<short id>`` when the link store is on,
+    else the compressed pack inline as ``r=<token>`` (v2, v1 fallback).
+    ``None`` when the answers do not fit a share link (see ``shareable_token``)."""
+    tok = current_exports().share_token
+    if tok is None:
+        return None
+    store = link_store()
+    if store is not None:
+        try:
+            return {"s": store.put(tok)}
+        except sqlite3.Error:
+            pass  # store unavailable: an inline link still works
+    return {"r": tok}
+
+
+def share_caption() -> str:
+    """What sharing does with the answers: embedded in the link, or kept on this server."""
+    store = link_store()
+    if store is None:
+        return "Skapar en läsbar 'report'-vy av din insiktskarta. Ingen data sparas – allt ligger inbäddat i länken."
+    days = round(store.ttl_s / 86400)
+    kept = (f"{days} dagar" if days > 1 else "1 dag") if days >= 1 else f"{max(1, round(store.ttl_s / 3600))} timmar"
+    return ("Skapar en läsbar 'report'-vy av din insiktskarta. Svaren sparas på servern i upp till "
+            f"{kept} efter att länken skapats; länken innehåller bara ett kort id.")
+
+
+def unpack_share_data(tok: str) -> Optional[Dict[str, Any]]:
+    return decode_share_token(tok)
+
+
+@st.cache_resource
+def report_cache() -> BoundedTTLCache:
+    """Process-wide cache of decoded report packs + rendered markdown."""
+    return BoundedTTLCache(
+        "report",
+        max_entries=int(os.environ.get("MIRRORGARDEN_REPORT_CACHE_ENTRIES", "512")),
+        max_bytes=int(os.environ.get("MIRRORGARDEN_REPORT_CACHE_BYTES", str(32 * 1024 * 1024))),
+        ttl_s=float(os.environ.get("MIRRORGARDEN_REPORT_CACHE_TTL", "3600")),
+    )
+
+
+def load_report_view(tok: str, theme: str) -> Optional[Tuple[Dict[str, Any], str]]:
+    """Decode + render a shared report once per (token, theme) for the whole process."""
+    def build():
+        data = unpack_share_data(tok)
+        if data is None:
+            return None
+        md = make_markdown_report(data)
+        # The decoded pack is roughly the size of its rendered markdown.
+        return (data, md), len(tok) + 2 * len(md.encode("utf-8"))
+
+    key = hashlib.sha256(f"{theme}\0{tok}".encode("utf-8")).digest()
+    return report_cache().get_or_build(key, build)
+
+
+def resolve_share_token() -> Optional[str]:
+    """Token for ``s=<id>`` from the link store, falling back to an inline ``r=``."""
+    store = link_store()
+    if url_get("s") and store is not None:
+        try:
+            tok = store.get(url_get("s"))
+        except sqlite3.Error:
+            tok = None  # store unavailable: treat like an expired id
+        if tok:
+            return tok
+    return url_get("r")
+
+
+def enter_report_mode_from_query() -> Optional[Tuple[Dict[str, Any], str]]:
+    if url_get("mode") == "report" and (url_get("r") or url_get("s")):
+        tok = resolve_share_token()
+        if tok is None:
+            render_rejected_report("Delningslänken har gått ut eller finns inte längre.")
+        view = load_report_view(tok, url_get("theme", "dark"))
+        if view is None:
+            render_rejected_report()
+        return view
+    return None
+
+
+def render_rejected_report(message: str = "Delningslänken kunde inte läsas. Den kan vara trasig, för lång eller ändrad."):
+    """Cheap view for links that could not be resolved or decoded (already counted in metrics)."""
+    st.error(message)
+    if st.button("Öppna i upplevelse-läge →", use_container_width=True):
+        url_clear()
+        url_state.rerun()
+    url_state.stop()
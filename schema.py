@@ -0,0 +1,18 @@
+"""Keys and limits of the ``answers`` section of an export pack.
+
+Shared by the answer store and the share codec. It lives apart from both so
+the store loads without the codec, which is only imported once a share link
+is made or opened (see report).
+"""
+from content import ATTACHMENT_ITEMS
+
+# Order is part of the v2 wire format (presence bitmask).
+ANSWER_KEYS = (
+    "grounding_notes", "timeline_points", "inner_critic", "inner_ally",
+    "boundaries_scores", "attachment_scores", "top_values", "values_why",
+    "reflection_cards", "soothing_kit", "self_letter",
+)
+TEXT_KEYS = ("grounding_notes", "inner_critic", "inner_ally", "values_why", "self_letter")
+TIMELINE_LEN = 3
+ATTACHMENT_STYLES = tuple(ATTACHMENT_ITEMS)
+MAX_TEXT_CHARS = 20_000
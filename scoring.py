@@ -0,0 +1,27 @@
+"""Pure scoring helpers shared by the app and the share codec (no Streamlit)."""
+from typing import Dict, Any
+
+from content import BOUNDARY_STATEMENTS
+
+# Insight dimension -> attachment style it averages (None: the boundary sliders).
+DIMENSIONS = (
+    ("Gränser", None),
+    ("Trygghet", "Trygg"),
+    ("Oro/Anknytning", "Ambivalent/Anxious"),
+    ("Avstånd/Undvikande", "Undvikande"),
+    ("Ambivalens/Rädsla", "Rädd/Desorganiserad"),
+)
+
+
+def dimension_scores(boundaries_avg: float, style_avgs: Dict[str, float]) -> Dict[str, float]:
+    """Map the per-block averages onto the five insight dimensions."""
+    return {dim: boundaries_avg if style is None else style_avgs.get(style, 0) for dim, style in DIMENSIONS}
+
+
+def compute_scores(answers: Dict[str, Any]) -> Dict[str, float]:
+    """Average the slider answers into the five insight dimensions (0–10)."""
+    b_scores = answers.get("boundaries_scores", [4]*len(BOUNDARY_STATEMENTS))
+    b_avg = sum(b_scores)/len(b_scores) if b_scores else 0
+    a_scores = answers.get("attachment_scores", {})
+    a_norm = {k: (sum(v)/len(v) if v else 0) for k, v in a_scores.items()}
+    return dimension_scores(b_avg, a_norm)
@@ -0,0 +1,50 @@
+"""Autosave: purge is synchronous, even with changes still queued."""
+import pytest
+
+import autosave
+
+pytestmark = pytest.mark.skipif(not autosave.AVAILABLE, reason="needs the cryptography package")
+
+
+@pytest.fixture
+def store(tmp_path):
+    # Long interval: the writer thread never flushes on its own during a test.
+    s = autosave.Autosave(str(tmp_path / "autosave.db"), secret=b"test", flush_interval_s=60)
+    yield s
+    s.close()
+
+
+def test_load_roundtrip(store):
+    code = autosave.new_code()
+    store.track(code, {"step": 3, "name": "Alva"}, {})
+    assert store.load(code) == {"step": 3, "name": "Alva"}
+
+
+def test_purge_deletes_rows(store):
+    code = autosave.new_code()
+    store.track(code, {"step": 3}, {})
+    store.flush()
+    assert store.stats()["rows"] == 1
+    assert store.purge(code)
+    assert store.stats()["rows"] == 0
+    assert store.load(code) is None
+
+
+def test_purge_drops_queued_changes(store):
+    code = autosave.new_code()
+    last = store.track(code, {"step": 1}, {})
+    store.flush()
+    store.track(code, {"step": 2}, last)  # queued, not yet written
+    assert store.purge(code)
+    store.track(code, {"step": 3}, {})    # a late rerun of the purged session
+    store.flush()
+    assert store.load(code) is None
+    assert store.stats()["rows"] == 0
+
+
+def test_purge_leaves_other_sessions(store):
+    keep, drop = autosave.new_code(), autosave.new_code()
+    store.track(keep, {"step": 1}, {})
+    store.track(drop, {"step": 2}, {})
+    store.purge(drop)
+    assert store.load(keep) == {"step": 1}
@@ -0,0 +1,82 @@
+"""Bounded decoder limits and share links at the maximum answer size."""
+import base64
+import random
+import string
+import zlib
+
+import pytest
+
+import share_codec
+from benchmarks.synthetic import synthetic_pack
+from schema import MAX_TEXT_CHARS, TEXT_KEYS
+from share_codec import (
+    MAX_DECODED_BYTES, MAX_TOKEN_CHARS, ShareTokenError, VERSION_V2,
+    _b64decode, _b64encode, decode_share_token, decode_share_token_strict,
+    encode_share_token, shareable_token,
+)
+
+
+def _reason(tok: str) -> str:
+    with pytest.raises(ShareTokenError) as exc:
+        decode_share_token_strict(tok)
+    return exc.value.reason
+
+
+@pytest.fixture
+def pack():
+    return synthetic_pack(random.Random(0))
+
+
+def test_roundtrip_v2(pack):
+    tok = encode_share_token(pack)
+    assert _b64decode(tok)[0] == VERSION_V2
+    assert decode_share_token(tok)["answers"] == pack["answers"]
+
+
+def test_too_long():
+    assert _reason("A" * (MAX_TOKEN_CHARS + 1)) == "too_long"
+
+
+def test_inflate_cap():
+    bomb = zlib.compress(b"[" + b" " * (MAX_DECODED_BYTES + 1) + b"]", 9)
+    tok = base64.urlsafe_b64encode(bomb).decode("ascii")
+    assert len(tok) <= MAX_TOKEN_CHARS
+    assert _reason(tok) == "too_large"
+
+
+def test_v1_needing_a_zdict_is_malformed():
+    c = zlib.compressobj(level=9, zdict=b'{"answers": {}}')
+    assert _reason(_b64encode(c.compress(b'{"answers": {}}') + c.flush())) == "malformed"
+
+
+def test_v2_with_another_zdict_is_malformed(pack, monkeypatch):
+    def deflate_with_foreign_dict(raw: bytes) -> bytes:
+        # Back-references land further back than TEXT_ZDICT reaches.
+        c = zlib.compressobj(level=9, wbits=-15, zdict=raw + b"\0" * 4096)
+        return c.compress(raw) + c.flush()
+
+    monkeypatch.setattr(share_codec, "_deflate_text", deflate_with_foreign_dict)
+    tok = encode_share_token(pack)
+    assert _b64decode(tok)[0] == VERSION_V2
+    assert _reason(tok) == "malformed"
+
+
+def test_max_text_roundtrips(pack):
+    for key in TEXT_KEYS:
+        pack["answers"][key] = ("jag känner mig trygg " * MAX_TEXT_CHARS)[:MAX_TEXT_CHARS]
+    tok = shareable_token(pack)
+    assert tok is not None and len(tok) <= MAX_TOKEN_CHARS
+    assert decode_share_token(tok)["answers"] == pack["answers"]
+
+
+def test_text_over_max_is_rejected(pack):
+    pack["answers"]["self_letter"] = "a" * (MAX_TEXT_CHARS + 1)
+    assert shareable_token(pack) is None
+
+
+def test_unshareable_pack_gets_no_token(pack):
+    rng = random.Random(1)
+    for key in TEXT_KEYS:
+        pack["answers"][key] = "".join(rng.choices(string.ascii_letters, k=MAX_TEXT_CHARS))
+    assert decode_share_token(encode_share_token(pack)) is None
+    assert shareable_token(pack) is None
@@ -0,0 +1,64 @@
+"""Theme palettes and their precompiled stylesheets.
+
+``style_tag(name)`` is built and minified once per theme per process and then
+shared by every session. The app emits it once per full run; because the
+bytes never change for a theme, Streamlit's ForwardMsg cache (threshold in
+``.streamlit/config.toml``) only sends the whole element the first time a
+session sees it and a hash reference after that, so a session effectively
+downloads the stylesheet again only when its theme changes.
+
+New themes only need an entry in ``THEMES``.
+"""
+import functools
+import re
+from string import Template
+from typing import Dict
+
+DEFAULT_THEME = "dark"
+THEMES: Dict[str, Dict[str, str]] = {
+    "dark": {"bg": "#0e1117", "text": "#e8e9ec", "card": "#0e1117", "border": "#262730", "sub": "#a6a7ab",
+             "accent": "#7bc99a"},
+    "light": {"bg": "#fafafa", "text": "#0b0c10", "card": "#ffffff", "border": "#e6e6e6", "sub": "#444",
+              "accent": "#2e8b57"},
+}
+
+_CSS = Template("""
+    html, body, [data-testid="stAppViewContainer"] {
+        background: $bg;
+        color: $text;
+    }
+    .block-container {padding-top: 1rem; padding-bottom: 2rem; max-width: 720px;}
+    .stButton>button {border-radius: 14px; padding: 0.7rem 1rem; font-weight: 600;}
+    .stTextInput>div>div>input, .stTextArea textarea {font-size: 1.05rem;}
+    .question-card {background: $card; border: 1px solid $border; border-radius: 16px; padding: 14px; margin: 10px 0;}
+    .soft {opacity: 0.92;}
+    .pill {display:inline-block; padding: 6px 10px; border-radius: 999px; border:1px solid $border;}
+    .muted {color:$sub; font-size:0.95rem;}
+    .center {text-align:center;}
+    .title {font-size:1.6rem; font-weight:800; line-height:1.2;}
+    .subtitle {font-size:1.1rem; opacity:0.95;}
+    .disclaimer {background:$card; border:1px solid $border; border-radius:14px; padding:12px;}
+    .tiny {font-size:0.85rem;}
+    .divider {height:1px; background:$border; margin:14px 0;}
+""")
+
+
+def minify_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def theme_name(name: str) -> str:
+    return name if name in THEMES else DEFAULT_THEME
+
+
+def style_tag(name: str) -> str:
+    """The ``<style>`` element for ``name`` (unknown names get the default theme)."""
+    return _compiled(theme_name(name))
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled(name: str) -> str:
+    return f"<style>{minify_css(_CSS.substitute(THEMES[name]))}</style>"
@@ -0,0 +1,110 @@
+"""Change-detecting sync between the session and ``st.query_params``.
+
+Writes are collected per session in a dirty set and flushed as one
+``st.query_params.from_dict`` call at the end of the script run (or right
+before ``st.rerun``/``st.stop``). A flush whose target equals the last known
+URL state sends nothing, so a rerun that "sets" the same theme again costs no
+ForwardMsg and no browser history entry.
+
+A write followed by ``st.rerun`` is sent again at the top of the next run:
+Streamlit drops whatever the previous run left unsent when a full run
+starts, so otherwise the browser URL can miss it (the server already has it).
+"""
+from typing import Dict, NoReturn, Optional, Set
+
+import streamlit as st
+
+import metrics
+
+_KEY = "_url_state"
+
+WRITES_METRIC = "mirrorgarden_url_writes_total"
+RERUNS_METRIC = "mirrorgarden_url_write_reruns_total"
+metrics.describe(WRITES_METRIC, "URL flushes by result: written, suppressed because nothing changed, or resent after a rerun.")
+metrics.describe(RERUNS_METRIC, "Script reruns requested right after a URL write.")
+
+
+def _read_url() -> Dict[str, str]:
+    return st.query_params.to_dict()
+
+
+class UrlState:
+    """Last known URL params, the params this run wants, and which keys changed."""
+
+    def __init__(self, known: Dict[str, str]):
+        self.known = dict(known)
+        self.desired = dict(known)
+        self.dirty: Set[str] = set()
+        self.resend = False
+
+    def sync(self, known: Dict[str, str]):
+        self.known = dict(known)
+        self.desired = dict(known)
+        self.dirty.clear()
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.desired.get(name, default)
+
+    def set(self, params: Dict[str, str], replace: bool = False):
+        target = {} if replace else dict(self.desired)
+        target.update({k: str(v) for k, v in params.items()})
+        self.dirty.update(k for k in set(target) | set(self.desired)
+                          if target.get(k) != self.desired.get(k))
+        self.desired = target
+
+    def flush(self) -> bool:
+        """Write the desired params if they differ from the URL; True if written."""
+        if not self.dirty:
+            return False
+        self.dirty.clear()
+        if self.desired == self.known:
+            metrics.inc(WRITES_METRIC, {"result": "suppressed"})
+            return False
+        st.query_params.from_dict(self.desired)
+        self.known = dict(self.desired)
+        metrics.inc(WRITES_METRIC, {"result": "written"})
+        return True
+
+
+def _state() -> UrlState:
+    if _KEY not in st.session_state:
+        st.session_state[_KEY] = UrlState(_read_url())
+    return st.session_state[_KEY]
+
+
+def begin_run():
+    """Re-read the URL at the top of a full script run (the user may have edited it)."""
+    state = _state()
+    state.sync(_read_url())
+    if state.resend:
+        state.resend = False
+        st.query_params.from_dict(state.known)
+        metrics.inc(WRITES_METRIC, {"result": "resent"})
+
+
+def url_get(name: str, default: Optional[str] = None) -> Optional[str]:
+    return _state().get(name, default)
+
+
+def url_set(params: Dict[str, str], replace: bool = False):
+    _state().set(params, replace=replace)
+
+
+def url_clear():
+    _state().set({}, replace=True)
+
+
+def flush() -> bool:
+    return _state().flush()
+
+
+def rerun() -> NoReturn:
+    if flush():
+        _state().resend = True
+        metrics.inc(RERUNS_METRIC)
+    st.rerun()
+
+
+def stop() -> NoReturn:
+    flush()
+    st.stop()